@@ -22,6 +22,8 @@ class Config:
     # ログ設定
     LOG_LEVEL = "INFO"
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # セッションサマリーを msgpack で保存するか（--msgpack-summary で有効化。既定は JSON）
+    SESSION_SUMMARY_MSGPACK = False
     
     # エージェント設定
     MAX_PROMPT_LENGTH = 100000  # プロンプト長制限を拡張
@@ -63,6 +65,13 @@ class TemplateConfig:
     DEFAULT_AGENTS_DIR = "./agents"
     DEFAULT_TEMPLATE = "simple_todo"  # デフォルトテンプレート
     
+    # デフォルトディレクトリの絶対パス（モジュール読み込み時に一度だけ解決）
+    DEFAULT_TEMPLATES_DIR_PATH = Path(DEFAULT_TEMPLATES_DIR).resolve()
+    DEFAULT_AGENTS_DIR_PATH = Path(DEFAULT_AGENTS_DIR).resolve()
+    
+    # テンプレートサマリーをプロセス内でキャッシュするか（--no-cache で無効化）
+    CACHE_LOADERS = True
+    
     # 利用可能なテンプレート（自動発見もサポート）
     KNOWN_TEMPLATES = {
         "simple_todo": "シンプルToDoアプリ開発テンプレート（Python Flask + SQLite + Bootstrap）"
@@ -71,16 +80,16 @@ class TemplateConfig:
     @classmethod
     def get_templates_directory(cls, custom_dir: str = None) -> Path:
         """テンプレートディレクトリの取得"""
-        from pathlib import Path
-        templates_dir = custom_dir or cls.DEFAULT_TEMPLATES_DIR
-        return Path(templates_dir).resolve()
+        if not custom_dir:
+            return cls.DEFAULT_TEMPLATES_DIR_PATH
+        return Path(custom_dir).resolve()
     
     @classmethod
     def get_agents_directory(cls, custom_dir: str = None) -> Path:
         """エージェントディレクトリの取得"""
-        from pathlib import Path
-        agents_dir = custom_dir or cls.DEFAULT_AGENTS_DIR
-        return Path(agents_dir).resolve()
+        if not custom_dir:
+            return cls.DEFAULT_AGENTS_DIR_PATH
+        return Path(custom_dir).resolve()
     
     @classmethod
     def is_valid_template(cls, template_name: str) -> bool:
@@ -2,11 +2,21 @@
 Multi-agent system core components
 """
 
-from .agent import ClaudeCodeAgent, AgentFactory
-from .orchestrator import MultiAgentOrchestrator
-from .log_manager import LogManager
-from .template_loader import TemplateLoader, ProjectTemplate, TemplateValidator
-from .agent_loader import AgentLoader, AgentDefinition, AgentRegistry
+import importlib
+
+# 公開名 -> 定義モジュール（一覧・検証系コマンドで orchestrator 等を読み込まないよう遅延import）
+_LAZY_EXPORTS = {
+    'ClaudeCodeAgent': '.agent',
+    'AgentFactory': '.agent',
+    'MultiAgentOrchestrator': '.orchestrator',
+    'LogManager': '.log_manager',
+    'TemplateLoader': '.template_loader',
+    'ProjectTemplate': '.template_loader',
+    'TemplateValidator': '.template_loader',
+    'AgentLoader': '.agent_loader',
+    'AgentDefinition': '.agent_loader',
+    'AgentRegistry': '.agent_loader'
+}
 
 __all__ = [
     'ClaudeCodeAgent',
@@ -20,3 +30,12 @@ __all__ = [
     'AgentDefinition',
     'AgentRegistry'
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -6,12 +6,11 @@ import asyncio
 import json
 import logging
 import os
-import time
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from config import Config, TemplateConfig
-from models.task import AgentRole, AgentTask, AgentResult
+from models.task import AgentRole, AgentTask, AgentResult, generate_task_id
 from .log_manager import LogManager
 from .agent_loader import AgentRegistry
 
@@ -49,7 +48,7 @@ class ClaudeCodeAgent:
     async def execute_task(self, task: AgentTask, timeout: Optional[int] = None, max_retries: int = 1) -> AgentResult:
         """Execute a task using Claude Code SDK - single attempt only, retries handled at workflow level"""
         if not task.task_id:
-            task.task_id = f"{self.role.value}_{int(time.time())}"
+            task.task_id = generate_task_id(self.role)
         
         print(f"🚀 Starting task {task.task_id} for {self.role.value}")
         
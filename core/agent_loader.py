@@ -5,7 +5,7 @@ Agent definition loader and validator for multi-agent system
 import yaml
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 
 
@@ -65,7 +65,7 @@ class AgentDefinition:
 class AgentLoader:
     """エージェント定義ローダーとバリデーター"""
     
-    def __init__(self, agents_dir: str = "./agents"):
+    def __init__(self, agents_dir: Union[str, Path] = "./agents"):
         self.agents_dir = Path(agents_dir or "./agents")
         self.logger = logging.getLogger(__name__)
         self.loaded_agents: Dict[str, AgentDefinition] = {}
@@ -302,7 +302,7 @@ class AgentLoader:
 class AgentRegistry:
     """エージェント定義の統合管理"""
     
-    def __init__(self, agents_dir: str = "./agents"):
+    def __init__(self, agents_dir: Union[str, Path] = "./agents"):
         self.agent_loader = AgentLoader(agents_dir)
         self.logger = logging.getLogger(__name__)
     
@@ -12,6 +12,15 @@ from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 import argparse
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# msgpack のマップ型の先頭バイト（fixmap: 0x80-0x8f, map16: 0xde, map32: 0xdf）
+_MSGPACK_MAP_PREFIXES = frozenset(range(0x80, 0x90)) | {0xde, 0xdf}
+
 
 class ConversationReplayer:
     """Claude会話ログの再現・表示クラス"""
@@ -195,6 +204,9 @@ class ConversationReplayer:
         
         print(f"📁 ログファイル: {log_file}")
         print(f"📅 セッション: {log_file.parent.name}")
+        summary = self.load_session_summary(log_file.parent)
+        if summary:
+            print(self.format_session_summary(summary))
         print()
         
         # 会話データを読み込み
@@ -230,6 +242,53 @@ class ConversationReplayer:
                 input("\n⏸️  続行するには Enter を押してください...")
                 print()
     
+    def load_session_summary(self, session_path: Path) -> Optional[Dict]:
+        """
+        セッションサマリーを読み込み
+        
+        先頭バイトで msgpack を判別し、それ以外は JSON として読み込む
+        
+        Args:
+            session_path: セッションディレクトリのパス
+            
+        Returns:
+            サマリー辞書（存在しない・読み込めない場合はNone）
+        """
+        for file_name in ("session_summary.msgpack", "session_summary.json"):
+            summary_file = session_path / file_name
+            try:
+                data = summary_file.read_bytes()
+            except OSError:
+                continue
+            
+            try:
+                if data and data[0] in _MSGPACK_MAP_PREFIXES:
+                    if not MSGPACK_AVAILABLE:
+                        continue
+                    return msgpack.unpackb(data, raw=False)
+                return json.loads(data.decode('utf-8'))
+            except ValueError:
+                continue
+        
+        return None
+    
+    @staticmethod
+    def format_session_summary(summary: Dict) -> str:
+        """
+        セッションサマリーを1行の表示用文字列に変換
+        
+        Args:
+            summary: load_session_summary で読み込んだサマリー辞書
+            
+        Returns:
+            整形されたサマリー文字列
+        """
+        successful = summary.get('successful_tasks', 0)
+        total = summary.get('total_tasks', 0)
+        rate = summary.get('success_rate', 0.0)
+        seconds = summary.get('total_execution_time_seconds', 0.0)
+        return f"📈 タスク: {successful}/{total} 成功 ({rate:.1%}) / 実行時間: {seconds:.1f}秒"
+    
     def list_available_sessions(self):
         """利用可能なセッション一覧を表示"""
         if not self.logs_dir.exists():
@@ -274,6 +333,9 @@ class ConversationReplayer:
             print(f"  {session_name}")
             print(f"    🕒 {readable_time}")
             print(f"    📊 {status}")
+            summary = self.load_session_summary(session_path)
+            if summary:
+                print(f"    {self.format_session_summary(summary)}")
             print()
 
 
@@ -8,20 +8,31 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
 
-from models.log import AgentExecutionLog, InteractionLog, SystemLog, SessionSummary
+from models.log import (
+    AgentExecutionLog, InteractionLog, SystemLog, SessionSummary,
+    EMPTY_SEQUENCE, EMPTY_DETAILS, MSGPACK_AVAILABLE
+)
+
+
+# システムイベントのレベルと標準ログのレベルの対応
+_LOG_LEVELS = {"error": logging.ERROR, "warning": logging.WARNING}
 
 
 class LogManager:
     """包括的なログ管理システム"""
     
-    def __init__(self, log_dir: str = "./logs"):
+    def __init__(self, log_dir: str = "./logs", msgpack_summary: bool = False):
         self.log_dir = Path(log_dir)
+        # セッションサマリーを msgpack で保存するか（指定時かつ msgpack がある場合のみ）
+        self.msgpack_summary = msgpack_summary and MSGPACK_AVAILABLE
         self.log_dir.mkdir(exist_ok=True)
         
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.execution_logs: List[AgentExecutionLog] = []
         self.interaction_logs: List[InteractionLog] = []
         self.system_logs: List[SystemLog] = []
+        # flush() まで出力を保留するシステムイベント（上限を設けず、flush() で全件を記録）
+        self.pending_system_logs: List[SystemLog] = []
         
         # ロガーを先に初期化
         self.logger = logging.getLogger(__name__)
@@ -38,7 +49,11 @@ class LogManager:
         self.interaction_log_file = session_dir / "agent_interactions.jsonl"
         self.claude_conversation_file = session_dir / "claude_conversations.jsonl"
         self.system_log_file = session_dir / "system.log"
-        self.summary_file = session_dir / "session_summary.json"
+        # 既定は JSON。指定時のみコンパクトなバイナリ形式で保存
+        if self.msgpack_summary:
+            self.summary_file = session_dir / "session_summary.msgpack"
+        else:
+            self.summary_file = session_dir / "session_summary.json"
         
         # システムログファイルハンドラー設定
         file_handler = logging.FileHandler(self.system_log_file)
@@ -77,7 +92,7 @@ class LogManager:
         execution_log.end_time = datetime.now()
         execution_log.status = "completed" if success else "failed"
         execution_log.output_length = len(output)
-        execution_log.artifacts_created = artifacts or []
+        execution_log.artifacts_created = artifacts or EMPTY_SEQUENCE
         execution_log.error_message = error
         execution_log.execution_time_seconds = (execution_log.end_time - execution_log.start_time).total_seconds()
         
@@ -100,7 +115,7 @@ class LogManager:
         # 該当する実行ログを見つけて更新
         for log in self.execution_logs:
             if log.agent_role == agent_role and log.task_id == task_id:
-                log.claude_code_commands.append(command)
+                log.add_claude_code_command(command)
                 break
         
         print(f"   🔧 [{agent_role}] Executed: {command[:50]}...")
@@ -113,7 +128,7 @@ class LogManager:
             from_agent=from_agent,
             to_agent=to_agent,
             interaction_type=interaction_type,
-            files_shared=files_shared or [],
+            files_shared=files_shared or EMPTY_SEQUENCE,
             message=message
         )
         
@@ -133,28 +148,53 @@ class LogManager:
             level=level,
             component=component,
             message=message,
-            details=details or {}
+            details=details or EMPTY_DETAILS
         )
         
         self.system_logs.append(system_log)
+        self._emit_system_log(system_log)
+    
+    def queue_system_event(self, level: str, component: str, message: str, details: Dict = None):
+        """システムイベントをキューに積み、flush() でまとめて記録"""
+        self.pending_system_logs.append(SystemLog(
+            timestamp=datetime.now(),
+            level=level,
+            component=component,
+            message=message,
+            details=details or EMPTY_DETAILS
+        ))
+    
+    def flush(self):
+        """キューに積まれたシステムイベントをまとめて記録"""
+        batch = self.pending_system_logs
+        if not batch:
+            return
+        self.pending_system_logs = []
         
-        # 標準ログにも出力
-        if level == "error":
-            self.logger.error(f"[{component}] {message}")
-        elif level == "warning":
-            self.logger.warning(f"[{component}] {message}")
+        self.system_logs.extend(batch)
+        # 1件ずつではなく、まとめた1レコードとして出力（重大度は最も高いものに合わせる）
+        level = max(_LOG_LEVELS.get(system_log.level, logging.INFO) for system_log in batch)
+        lines = [f"[{system_log.level.upper()}] [{system_log.component}] {system_log.message}" for system_log in batch]
+        self.logger.log(level, "%d queued events\n%s", len(batch), "\n".join(lines))
+    
+    def _emit_system_log(self, system_log: SystemLog):
+        """システムイベントを標準ログにも出力"""
+        if system_log.level == "error":
+            self.logger.error(f"[{system_log.component}] {system_log.message}")
+        elif system_log.level == "warning":
+            self.logger.warning(f"[{system_log.component}] {system_log.message}")
         else:
-            self.logger.info(f"[{component}] {message}")
+            self.logger.info(f"[{system_log.component}] {system_log.message}")
     
     def _write_execution_log(self, log: AgentExecutionLog):
         """実行ログをファイルに書き込み"""
-        with open(self.execution_log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log.to_dict(), ensure_ascii=False) + '\n')
+        with open(self.execution_log_file, 'ab') as f:
+            f.write(log.to_json() + b'\n')
     
     def _write_interaction_log(self, log: InteractionLog):
         """相互作用ログをファイルに書き込み"""
-        with open(self.interaction_log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log.to_dict(), ensure_ascii=False) + '\n')
+        with open(self.interaction_log_file, 'ab') as f:
+            f.write(log.to_json() + b'\n')
     
     def log_claude_conversation(self, agent_role: str, task_id: str, prompt: str, 
                               stdout: str, stderr: str, return_code: int):
@@ -199,14 +239,32 @@ class LogManager:
             total_artifacts = 0
             claude_code_commands_count = 0
         else:
-            start_time = min(log.start_time for log in self.execution_logs)
-            end_time = max((log.end_time for log in self.execution_logs if log.end_time), default=datetime.now())
-            total_execution_time = sum(log.execution_time_seconds for log in self.execution_logs)
-            successful_tasks = len([log for log in self.execution_logs if log.status == "completed"])
-            failed_tasks = len([log for log in self.execution_logs if log.status == "failed"])
-            agents_involved = list(set(log.agent_role for log in self.execution_logs))
-            total_artifacts = sum(len(log.artifacts_created) for log in self.execution_logs)
-            claude_code_commands_count = sum(len(log.claude_code_commands) for log in self.execution_logs)
+            # 実行ログを1回の走査で集計
+            start_time = self.execution_logs[0].start_time
+            end_time = None
+            total_execution_time = 0
+            successful_tasks = failed_tasks = 0
+            agents = set()
+            total_artifacts = 0
+            claude_code_commands_count = 0
+            
+            for log in self.execution_logs:
+                if log.start_time < start_time:
+                    start_time = log.start_time
+                if log.end_time and (end_time is None or log.end_time > end_time):
+                    end_time = log.end_time
+                total_execution_time += log.execution_time_seconds
+                if log.status == "completed":
+                    successful_tasks += 1
+                elif log.status == "failed":
+                    failed_tasks += 1
+                agents.add(log.agent_role)
+                total_artifacts += len(log.artifacts_created)
+                claude_code_commands_count += len(log.claude_code_commands)
+            
+            if end_time is None:
+                end_time = datetime.now()
+            agents_involved = list(agents)
         
         summary = SessionSummary(
             session_id=self.session_id,
@@ -219,13 +277,17 @@ class LogManager:
             agents_involved=agents_involved,
             total_artifacts_created=total_artifacts,
             total_interactions=len(self.interaction_logs),
-            error_count=len([log for log in self.system_logs if log.level == "error"]),
+            error_count=sum(1 for log in self.system_logs if log.level == "error"),
             claude_code_commands_count=claude_code_commands_count
         )
         
         # ファイルに保存
-        with open(self.summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary.to_dict(), f, indent=2, ensure_ascii=False)
+        if self.msgpack_summary:
+            with open(self.summary_file, 'wb') as f:
+                f.write(summary.to_msgpack())
+        else:
+            with open(self.summary_file, 'w', encoding='utf-8') as f:
+                json.dump(summary.to_dict(), f, indent=2, ensure_ascii=False)
         
         return summary
     
@@ -20,7 +20,8 @@ class MultiAgentOrchestrator:
     def __init__(self, project_dir: str = None, template_name: str = None, 
                  templates_dir: str = None, agents_dir: str = None, max_retries: int = 3):
         self.project_dir = Config.get_project_dir(project_dir)
-        self.log_manager = LogManager(Config.get_log_dir(self.project_dir))
+        self.log_manager = LogManager(Config.get_log_dir(self.project_dir),
+                                      msgpack_summary=Config.SESSION_SUMMARY_MSGPACK)
         
         # エージェントディレクトリの設定
         self.agents_dir = agents_dir or TemplateConfig.DEFAULT_AGENTS_DIR
@@ -2,20 +2,54 @@
 Template loader and validator for multi-agent system
 """
 
+import os
 import yaml
 import json
 import logging
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 
 from models.task import AgentRole, AgentTask
 from .agent_loader import AgentLoader
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# テンプレート構造検証の必須フィールド（順序はエラーメッセージ用、集合は高速判定用）
+_REQUIRED_PROJECT_FIELDS = ('name', 'description')
+_REQUIRED_PHASE_FIELDS = ('phase', 'agent', 'dependencies', 'parallel')
+_REQUIRED_TASK_FIELDS = ('agent', 'title', 'prompt', 'output_files', 'context_files')
+_REQUIRED_PROJECT_FIELD_SET = frozenset(_REQUIRED_PROJECT_FIELDS)
+_REQUIRED_PHASE_FIELD_SET = frozenset(_REQUIRED_PHASE_FIELDS)
+_REQUIRED_TASK_FIELD_SET = frozenset(_REQUIRED_TASK_FIELDS)
+
+# ロール値 -> AgentRole の直接参照（Enum.__call__ のオーバーヘッドを回避）
+_AGENT_ROLES_BY_VALUE = AgentRole._value2member_map_
+
+# get_template_summary のLRUキャッシュ上限
+_SUMMARY_CACHE_MAX_SIZE = 128
+
+# (テンプレートファイル, エージェントディレクトリ) -> ((mtime_ns, size), summary) のLRUキャッシュ
+# ローダーのインスタンスをまたいでプロセス内で共有し、ファイルの (mtime, size) で有効性を確認する
+_summary_cache: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
 
 @dataclass
 class ProjectTemplate:
     """プロジェクトテンプレートのデータクラス"""
+    # Python 3.8 をサポートするため dataclass(slots=True) ではなく手動で定義
+    __slots__ = ('name', 'description', 'technology_stack', 'workflow', 'agents', 'tasks',
+                 '_agent_roles', '_task_names')
+    
     name: str
     description: str
     technology_stack: List[str]
@@ -23,15 +57,20 @@ class ProjectTemplate:
     agents: Dict[str, Any]
     tasks: Dict[str, Any]
     
+    def __post_init__(self):
+        """ロール名・タスク名を一度だけ計算してキャッシュ"""
+        self._agent_roles = tuple(self.agents.keys())
+        self._task_names = tuple(self.tasks.keys())
+    
     @property
-    def agent_roles(self) -> List[str]:
-        """利用可能なエージェントロールのリスト"""
-        return list(self.agents.keys())
+    def agent_roles(self) -> Tuple[str, ...]:
+        """利用可能なエージェントロールのタプル"""
+        return self._agent_roles
     
     @property
-    def task_names(self) -> List[str]:
-        """タスク名のリスト"""
-        return list(self.tasks.keys())
+    def task_names(self) -> Tuple[str, ...]:
+        """タスク名のタプル"""
+        return self._task_names
     
     def get_task_dependencies(self, task_name: str) -> List[str]:
         """指定されたタスクの依存関係を取得"""
@@ -91,12 +130,42 @@ class ProjectTemplate:
 class TemplateLoader:
     """テンプレートローダーとバリデーター"""
     
-    def __init__(self, templates_dir: str = "./templates", agents_dir: str = "./agents"):
+    def __init__(self, templates_dir: Union[str, Path] = "./templates", agents_dir: Union[str, Path] = "./agents",
+                 preload: bool = False, cache_summaries: bool = True):
         self.templates_dir = Path(templates_dir or "./templates")
+        # ファイルパス組み立て用の文字列プレフィックス（Path オブジェクト生成を回避）
+        self._templates_dir_prefix = os.fspath(self.templates_dir) + os.sep
+        # テンプレート名 -> 拡張子 ('.yaml' / '.yml')
+        self._template_suffixes: Dict[str, str] = {}
         self.agent_loader = AgentLoader(agents_dir)
         self.logger = logging.getLogger(__name__)
         self.loaded_templates: Dict[str, ProjectTemplate] = {}
+        # テンプレートサマリーをプロセス内で共有するキャッシュを使うか
+        self.cache_summaries = cache_summaries
+        
+        # 全テンプレートを使う場合は初期化時にまとめて読み込む（デフォルトは遅延読み込み）
+        if preload:
+            self.preload_templates()
+        
+    def preload_templates(self) -> Dict[str, ProjectTemplate]:
+        """全テンプレートを並列で一括読み込み"""
+        template_names = self.discover_templates()
         
+        # エージェント定義は全テンプレートの互換性チェックで共有されるため先に読み込む
+        self.agent_loader.load_all_agents()
+        
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(self._preload_template, template_names))
+        
+        return self.loaded_templates
+    
+    def _preload_template(self, template_name: str):
+        """一括読み込み用: 失敗したテンプレートはログに残してスキップ"""
+        try:
+            self.load_template(template_name)
+        except Exception as e:
+            self.logger.error(f"Failed to preload template {template_name}: {e}")
+    
     def discover_templates(self) -> List[str]:
         """利用可能なテンプレートファイルを発見"""
         if not self.templates_dir.exists():
@@ -106,9 +175,11 @@ class TemplateLoader:
         template_files = []
         for file_path in self.templates_dir.glob("*.yaml"):
             template_files.append(file_path.stem)
+            self._template_suffixes.setdefault(file_path.stem, ".yaml")
         
         for file_path in self.templates_dir.glob("*.yml"):
             template_files.append(file_path.stem)
+            self._template_suffixes.setdefault(file_path.stem, ".yml")
             
         self.logger.info(f"Discovered {len(template_files)} templates: {template_files}")
         return sorted(template_files)
@@ -118,16 +189,8 @@ class TemplateLoader:
         if template_name in self.loaded_templates:
             return self.loaded_templates[template_name]
         
-        # YAML ファイルを探索
-        yaml_file = self.templates_dir / f"{template_name}.yaml"
-        yml_file = self.templates_dir / f"{template_name}.yml"
-        
-        template_file = None
-        if yaml_file.exists():
-            template_file = yaml_file
-        elif yml_file.exists():
-            template_file = yml_file
-        else:
+        template_file = self._find_template_file(template_name)
+        if template_file is None:
             raise FileNotFoundError(f"Template file not found: {template_name}")
         
         try:
@@ -166,6 +229,22 @@ class TemplateLoader:
         except KeyError as e:
             raise ValueError(f"Missing required field in template {template_name}: {e}")
     
+    def _find_template_file(self, template_name: str) -> Optional[str]:
+        """テンプレート名に対応するYAMLファイルを探索"""
+        base_path = self._templates_dir_prefix + template_name
+        
+        # discover_templates で拡張子が判明していれば stat 不要
+        suffix = self._template_suffixes.get(template_name)
+        if suffix is not None:
+            return base_path + suffix
+        
+        for suffix in (".yaml", ".yml"):
+            if os.path.isfile(base_path + suffix):
+                self._template_suffixes[template_name] = suffix
+                return base_path + suffix
+        
+        return None
+    
     def _validate_template_structure(self, template_data: Dict, template_name: str):
         """テンプレート構造の検証"""
         required_sections = ['project', 'workflow', 'agents', 'tasks']
@@ -176,10 +255,9 @@ class TemplateLoader:
         
         # project セクションの検証
         project = template_data['project']
-        required_project_fields = ['name', 'description']
-        for field in required_project_fields:
-            if field not in project:
-                raise ValueError(f"Missing required field '{field}' in project section")
+        if not project.keys() >= _REQUIRED_PROJECT_FIELD_SET:
+            missing = next(f for f in _REQUIRED_PROJECT_FIELDS if f not in project)
+            raise ValueError(f"Missing required field '{missing}' in project section")
         
         # workflow セクションの検証
         workflow = template_data['workflow']
@@ -188,10 +266,9 @@ class TemplateLoader:
         
         # 各フェーズの検証
         for phase in workflow['phases']:
-            required_phase_fields = ['phase', 'agent', 'dependencies', 'parallel']
-            for field in required_phase_fields:
-                if field not in phase:
-                    raise ValueError(f"Missing required field '{field}' in phase: {phase.get('phase', 'unknown')}")
+            if not phase.keys() >= _REQUIRED_PHASE_FIELD_SET:
+                missing = next(f for f in _REQUIRED_PHASE_FIELDS if f not in phase)
+                raise ValueError(f"Missing required field '{missing}' in phase: {phase.get('phase', 'unknown')}")
         
         # agents セクションの検証
         agents = template_data['agents']
@@ -204,10 +281,9 @@ class TemplateLoader:
         # tasks セクションの検証
         tasks = template_data['tasks']
         for task_name, task_info in tasks.items():
-            required_task_fields = ['agent', 'title', 'prompt', 'output_files', 'context_files']
-            for field in required_task_fields:
-                if field not in task_info:
-                    raise ValueError(f"Missing required field '{field}' in task: {task_name}")
+            if not task_info.keys() >= _REQUIRED_TASK_FIELD_SET:
+                missing = next(f for f in _REQUIRED_TASK_FIELDS if f not in task_info)
+                raise ValueError(f"Missing required field '{missing}' in task: {task_name}")
         
         self.logger.debug(f"Template structure validation passed for: {template_name}")
     
@@ -251,9 +327,8 @@ class TemplateLoader:
                 self.logger.error(f"Agent role not available: {agent_name}")
                 continue
             
-            try:
-                agent_role = AgentRole(agent_name)
-            except ValueError:
+            agent_role = _AGENT_ROLES_BY_VALUE.get(agent_name)
+            if agent_role is None:
                 self.logger.error(f"Invalid agent role: {agent_name}")
                 continue
             
@@ -262,7 +337,7 @@ class TemplateLoader:
                 role=agent_role,
                 prompt=task_info['prompt'],
                 task_id=f"{agent_name}_{phase_name}",
-                dependencies=[AgentRole(dep) for dep in dependencies if dep in available_roles],
+                dependencies=[_AGENT_ROLES_BY_VALUE[dep] for dep in dependencies if dep in available_roles],
                 output_file=task_info['output_files'][0] if task_info['output_files'] else None,
                 context_files=task_info.get('context_files', [])
             )
@@ -274,13 +349,36 @@ class TemplateLoader:
     
     def get_template_summary(self, template_name: str) -> Dict[str, Any]:
         """テンプレートのサマリー情報を取得"""
+        # ファイルの (mtime, size) が変わっていなければキャッシュを返す
+        file_key = None
+        template_file = self._find_template_file(template_name) if self.cache_summaries else None
+        if template_file is not None:
+            try:
+                stat = os.stat(template_file)
+                file_key = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                # 発見後に削除されたファイル
+                self._template_suffixes.pop(template_name, None)
+        
+        cache_key = (template_file, os.fspath(self.agent_loader.agents_dir))
+        if file_key is not None:
+            with _summary_cache_lock:
+                cached = _summary_cache.get(cache_key)
+                if cached is not None and cached[0] == file_key:
+                    _summary_cache.move_to_end(cache_key)
+                    # 呼び出し側の変更がキャッシュに及ばないようコピーを返す
+                    return deepcopy(cached[1])
+            if cached is not None:
+                # ファイルが更新されたので読み込み済みテンプレートも破棄
+                self.loaded_templates.pop(template_name, None)
+        
         try:
             template = self.load_template(template_name)
             
             # エージェント互換性チェック
             compatibility = self.agent_loader.validate_agent_compatibility(template.agent_roles)
             
-            return {
+            summary = {
                 "name": template.name,
                 "description": template.description,
                 "technology_stack": template.technology_stack,
@@ -296,6 +394,15 @@ class TemplateLoader:
                 "name": template_name,
                 "error": str(e)
             }
+        
+        if file_key is not None:
+            with _summary_cache_lock:
+                _summary_cache[cache_key] = (file_key, summary)
+                if len(_summary_cache) > _SUMMARY_CACHE_MAX_SIZE:
+                    _summary_cache.popitem(last=False)
+            return deepcopy(summary)
+        
+        return summary
     
     def list_templates_summary(self) -> List[Dict[str, Any]]:
         """全テンプレートのサマリーリストを取得"""
@@ -365,6 +472,8 @@ class TemplateValidator:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # 専門性キーワードのオートマトンキャッシュ（キー: 小文字化済み専門性のタプル）
+        self._expertise_automata: Dict[Tuple[str, ...], Any] = {}
     
     def validate_workflow_dependencies(self, template: ProjectTemplate) -> List[str]:
         """ワークフローの依存関係の整合性をチェック"""
@@ -387,44 +496,54 @@ class TemplateValidator:
             dependencies = phase.get('dependencies', [])
             dependency_graph[phase_name] = dependencies
         
-        # 簡単な循環検出
+        # 簡単な循環検出（非循環と確定したノードは全フェーズで共有）
+        visited = set()
         for phase_name in dependency_graph:
-            if self._has_circular_dependency(dependency_graph, phase_name, set()):
+            if self._has_circular_dependency(dependency_graph, phase_name, visited, set()):
                 errors.append(f"Circular dependency detected involving phase: {phase_name}")
         
         return errors
     
-    def _has_circular_dependency(self, graph: Dict[str, List[str]], node: str, visited: set) -> bool:
-        """循環依存の検出（深さ優先探索）"""
-        if node in visited:
-            return True
+    def _has_circular_dependency(self, graph: Dict[str, List[str]], node: str,
+                                 visited: set, stack: set) -> bool:
+        """循環依存の検出（深さ優先探索）
         
-        visited.add(node)
+        stack は現在の探索経路、visited は循環が無いと確定したノード
+        """
+        if node in stack:
+            return True
+        if node in visited:
+            return False
         
+        stack.add(node)
         for dependency in graph.get(node, []):
-            if dependency in graph and self._has_circular_dependency(graph, dependency, visited.copy()):
+            if dependency in graph and self._has_circular_dependency(graph, dependency, visited, stack):
                 return True
+        stack.discard(node)
         
+        visited.add(node)
         return False
     
     def validate_agent_expertise_coverage(self, template: ProjectTemplate) -> List[str]:
         """エージェントの専門性がタスクをカバーしているかチェック"""
         warnings = []
         
+        # エージェントごとの専門性キーワードを一度だけ小文字化
+        lowered_expertise = {
+            agent_name: tuple(expertise.lower() for expertise in agent_info.get('expertise', []))
+            for agent_name, agent_info in template.agents.items()
+        }
+        
         # 簡単なキーワードマッチングによる検証
         for task_name, task_info in template.tasks.items():
             agent_name = task_info['agent']
-            agent_info = template.agents.get(agent_name, {})
-            agent_expertise = agent_info.get('expertise', [])
+            agent_expertise = lowered_expertise.get(agent_name, ())
             
             # タスクのプロンプトに含まれるキーワードをチェック
             prompt_lower = task_info['prompt'].lower()
             
             # 専門性のキーワードがプロンプトに含まれているかざっくりチェック
-            expertise_coverage = any(
-                expertise.lower() in prompt_lower 
-                for expertise in agent_expertise
-            )
+            expertise_coverage = self._matches_expertise(agent_expertise, prompt_lower)
             
             if not expertise_coverage:
                 warnings.append(
@@ -433,6 +552,23 @@ class TemplateValidator:
         
         return warnings
     
+    def _matches_expertise(self, agent_expertise: Tuple[str, ...], prompt_lower: str) -> bool:
+        """小文字化済みの専門性キーワードのいずれかがプロンプトに含まれるかを判定"""
+        # 空文字列は常にマッチするが、オートマトンには登録できない
+        if not AHOCORASICK_AVAILABLE or not all(agent_expertise):
+            return any(expertise in prompt_lower for expertise in agent_expertise)
+        
+        automaton = self._expertise_automata.get(agent_expertise)
+        if automaton is None:
+            automaton = ahocorasick.Automaton()
+            for expertise in agent_expertise:
+                automaton.add_word(expertise, expertise)
+            automaton.make_automaton()
+            self._expertise_automata[agent_expertise] = automaton
+        
+        # 最初のマッチで打ち切り
+        return next(automaton.iter(prompt_lower), None) is not None
+    
     def validate_retry_workflow(self, template: ProjectTemplate) -> Dict[str, Any]:
         """Validate that the template supports cross-phase retry functionality"""
         validation_result = {
@@ -443,6 +579,17 @@ class TemplateValidator:
         }
         
         phases = [phase['phase'] for phase in template.workflow['phases']]
+        phase_set = set(phases)
+        
+        # Lowercase and classify each phase name in a single pass
+        testing_phases = []
+        dev_phases = []
+        for phase in phases:
+            phase_lower = phase.lower()
+            if 'test' in phase_lower or 'qa' in phase_lower or 'verification' in phase_lower:
+                testing_phases.append(phase)
+            if 'develop' in phase_lower or 'implementation' in phase_lower or 'coding' in phase_lower:
+                dev_phases.append(phase)
         
         # Check for common retry patterns
         retry_patterns = [
@@ -455,7 +602,7 @@ class TemplateValidator:
         
         found_patterns = []
         for pattern_phases, description in retry_patterns:
-            if all(phase in phases for phase in pattern_phases):
+            if phase_set.issuperset(pattern_phases):
                 found_patterns.append(description)
                 validation_result["retry_pairs"].append(pattern_phases)
         
@@ -468,21 +615,19 @@ class TemplateValidator:
             )
         
         # Check for testing phases that can trigger retries
-        testing_phases = [p for p in phases if any(keyword in p.lower() for keyword in ['test', 'qa', 'verification'])]
         if not testing_phases:
             validation_result["warnings"].append(
                 "No testing phases found. Cross-phase retry works best with testing phases that can detect bugs."
             )
         
         # Check for development phases that can be retried
-        dev_phases = [p for p in phases if any(keyword in p.lower() for keyword in ['develop', 'implementation', 'coding'])]
         if not dev_phases:
             validation_result["warnings"].append(
                 "No development phases found. Cross-phase retry needs development phases to fix bugs."
             )
         
         # Recommendations
-        if 'testing' in phases and 'development' in phases:
+        if 'testing' in phase_set and 'development' in phase_set:
             validation_result["recommendations"].append(
                 "Consider adding a 'bug_fixing' phase between testing and retesting for better retry workflow."
             )
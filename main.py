@@ -4,16 +4,14 @@ Multi-Agent TODO App Development System
 Main execution entry point
 """
 
-import asyncio
 import argparse
 import logging
 import sys
-import subprocess
+from functools import lru_cache
 from pathlib import Path
+from typing import List
 
 from config import Config, TemplateConfig
-from core.orchestrator import MultiAgentOrchestrator
-from core.conversation_replayer import ConversationReplayer
 
 
 def setup_logging():
@@ -24,17 +22,64 @@ def setup_logging():
     )
 
 
+def _resolve_dirs(templates_dir, agents_dir):
+    """未指定のディレクトリを解決済みのデフォルトパスで補完"""
+    return (templates_dir or TemplateConfig.DEFAULT_TEMPLATES_DIR_PATH,
+            agents_dir or TemplateConfig.DEFAULT_AGENTS_DIR_PATH)
+
+
+def _get_template_loader(templates_dir: str = None, agents_dir: str = None):
+    """TemplateLoaderの取得（サマリーは template_loader 側のキャッシュをインスタンス間で共有）"""
+    from core.template_loader import TemplateLoader
+    templates_dir, agents_dir = _resolve_dirs(templates_dir, agents_dir)
+    return TemplateLoader(templates_dir, agents_dir, cache_summaries=TemplateConfig.CACHE_LOADERS)
+
+
+def _get_agent_loader(agents_dir: str = None):
+    """AgentLoaderの取得"""
+    from core.agent_loader import AgentLoader
+    return AgentLoader(agents_dir or TemplateConfig.DEFAULT_AGENTS_DIR_PATH)
+
+
+def _get_templates_summary(templates_dir: str = None, agents_dir: str = None):
+    """全テンプレートのサマリーリストを取得"""
+    return _get_template_loader(templates_dir, agents_dir).list_templates_summary()
+
+
+def _write_lines(lines: List[str]):
+    """複数行の出力を1回の書き込みでまとめて標準出力へ送る"""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+@lru_cache(maxsize=1)
+def _probe_sdk() -> bool:
+    """Claude Code SDK の利用可否（インポート試行は初回のみ）"""
+    try:
+        import claude_code_sdk
+        return True
+    except ImportError:
+        return False
+
+
+_sdk_status_reported = False
+
+
 def validate_environment():
     """環境の事前チェック"""
+    global _sdk_status_reported
     errors = Config.validate()
     
-    # Claude Code SDK の存在確認
-    try:
-        import claude_code_sdk
-        print("✅ Claude Code SDK available")
-    except ImportError:
-        print("⚠️ Claude Code SDK not available - using fallback mode")
-        # SDKがなくてもモック実装で動作するため、エラーにはしない
+    # Claude Code SDK の存在確認（結果の表示は初回のみ）
+    sdk_available = _probe_sdk()
+    if not _sdk_status_reported:
+        _sdk_status_reported = True
+        if sdk_available:
+            print("✅ Claude Code SDK available")
+        else:
+            print("⚠️ Claude Code SDK not available - using fallback mode")
+            # SDKがなくてもモック実装で動作するため、エラーにはしない
     
     if errors:
         print("❌ Environment validation failed:")
@@ -58,27 +103,42 @@ async def run_development_workflow(project_dir: str = None, template_name: str =
         
         # テンプレートとエージェントの検証のみ実行
         try:
-            from core.template_loader import TemplateLoader
-            from core.agent_loader import AgentLoader
+            import asyncio
+            
+            agent_loader = _get_agent_loader(agents_dir)
+            loader = _get_template_loader(templates_dir, agents_dir)
+            
+            def load_template_info():
+                if template_name:
+                    template = loader.load_template(template_name)
+                    return template, loader.get_agent_requirements_summary(template_name)
+                return _get_templates_summary(templates_dir, agents_dir)
+            
+            # エージェント定義とテンプレートのYAML読み込みを並行実行
+            # (asyncio.to_thread は Python 3.9+ のため run_in_executor を使用)
+            loop = asyncio.get_running_loop()
+            agents, template_info_result = await asyncio.gather(
+                loop.run_in_executor(None, agent_loader.get_agents_summary),
+                loop.run_in_executor(None, load_template_info),
+                return_exceptions=True
+            )
             
             # エージェント定義の検証
-            agent_loader = AgentLoader(agents_dir)
             print(f"\n👥 Validating agent definitions in: {agents_dir or TemplateConfig.DEFAULT_AGENTS_DIR}")
-            agents = agent_loader.get_agents_summary()
-            
+            if isinstance(agents, Exception):
+                raise agents
             print(f"   Found {len(agents)} agent definitions:")
             for agent in agents:
                 print(f"   ✅ {agent['role']}: {agent['display_name']}")
             
             # テンプレートの検証
-            loader = TemplateLoader(templates_dir, agents_dir)
-            
             if template_name:
                 print(f"\n📋 Validating template: {template_name}")
-                template = loader.load_template(template_name)
+                if isinstance(template_info_result, Exception):
+                    raise template_info_result
+                template, agent_req_summary = template_info_result
                 
                 # エージェント互換性チェック
-                agent_req_summary = loader.get_agent_requirements_summary(template_name)
                 compatibility = agent_req_summary["compatibility"]
                 
                 print(f"✅ Template validation passed")
@@ -92,8 +152,9 @@ async def run_development_workflow(project_dir: str = None, template_name: str =
                 
             else:
                 print("\n📋 Available templates:")
-                templates = loader.list_templates_summary()
-                for template_info in templates:
+                if isinstance(template_info_result, Exception):
+                    raise template_info_result
+                for template_info in template_info_result:
                     if 'error' in template_info:
                         print(f"   ❌ {template_info['name']}: {template_info['error']}")
                     else:
@@ -114,7 +175,9 @@ async def run_development_workflow(project_dir: str = None, template_name: str =
     print("🚀 Starting Multi-Agent Development System")
     print("="*60)
     
-    # オーケストレーター初期化
+    # オーケストレーター初期化（一覧・検証系コマンドでは読み込まないよう遅延import）
+    from core.orchestrator import MultiAgentOrchestrator
+    
     try:
         orchestrator = MultiAgentOrchestrator(project_dir, template_name, templates_dir, agents_dir, max_retries)
         orchestrator.default_timeout = timeout  # タイムアウトを設定
@@ -151,27 +214,29 @@ async def run_development_workflow(project_dir: str = None, template_name: str =
             
     except KeyboardInterrupt:
         print("\n⚠️  Development workflow interrupted by user")
-        orchestrator.log_manager.log_system_event(
+        orchestrator.log_manager.queue_system_event(
             "warning", "main", "Workflow interrupted by user"
         )
         return False
         
     except Exception as e:
         print(f"\n💥 Workflow execution failed: {str(e)}")
-        orchestrator.log_manager.log_system_event(
+        orchestrator.log_manager.queue_system_event(
             "error", "main", f"Workflow execution failed: {str(e)}"
         )
+        # サマリーのエラー件数に反映させるため表示前に記録
+        orchestrator.log_manager.flush()
         orchestrator.log_manager.print_session_summary()
         raise
+    
+    finally:
+        orchestrator.log_manager.flush()
 
 
 def select_template(templates_dir: str = None, agents_dir: str = None) -> str:
     """対話式テンプレート選択"""
-    from core.template_loader import TemplateLoader
-    
     try:
-        loader = TemplateLoader(templates_dir, agents_dir)
-        templates = loader.list_templates_summary()
+        templates = _get_templates_summary(templates_dir, agents_dir)
         
         if not templates:
             print("❌ No templates found in templates directory")
@@ -180,7 +245,7 @@ def select_template(templates_dir: str = None, agents_dir: str = None) -> str:
         print("\n📋 Available Project Templates:")
         print("-" * 50)
         
-        valid_templates = []
+        valid_templates = {}  # 表示番号 -> テンプレート名
         for i, template_info in enumerate(templates, 1):
             if 'error' in template_info:
                 print(f"   {i}. ❌ {template_info['name']}: {template_info['error']}")
@@ -203,25 +268,32 @@ def select_template(templates_dir: str = None, agents_dir: str = None) -> str:
                         tech_stack += '...'
                     print(f"      🔧 {tech_stack}")
                 print()
-                valid_templates.append((i, template_info['name']))
+                valid_templates[i] = template_info['name']
         
         if not valid_templates:
             print("❌ No valid templates available")
             return None
         
+        # 行編集・入力履歴を有効化（readline が無い環境ではそのまま）
+        try:
+            import readline  # noqa: F401
+        except ImportError:
+            pass
+        
         # ユーザー選択
+        prompt = f"Select template (1-{len(templates)}) or 'q' to quit: "
+        invalid_message = f"❌ Invalid choice. Please select 1-{len(templates)}"
         while True:
             try:
-                choice = input(f"Select template (1-{len(templates)}) or 'q' to quit: ").strip()
+                choice = input(prompt).strip()
                 if choice.lower() == 'q':
                     return None
                 
-                choice_num = int(choice)
-                for num, template_name in valid_templates:
-                    if num == choice_num:
-                        return template_name
+                template_name = valid_templates.get(int(choice))
+                if template_name is not None:
+                    return template_name
                 
-                print(f"❌ Invalid choice. Please select 1-{len(templates)}")
+                print(invalid_message)
                 
             except ValueError:
                 print("❌ Please enter a number or 'q'")
@@ -236,160 +308,165 @@ def select_template(templates_dir: str = None, agents_dir: str = None) -> str:
 
 def list_templates(templates_dir: str = None, agents_dir: str = None):
     """利用可能なテンプレートの一覧表示"""
-    from core.template_loader import TemplateLoader
-    
+    lines = []
     try:
-        loader = TemplateLoader(templates_dir, agents_dir)
-        templates = loader.list_templates_summary()
+        templates = _get_templates_summary(templates_dir, agents_dir)
         
-        print("📋 Available Project Templates")
-        print("=" * 60)
+        lines.append("📋 Available Project Templates")
+        lines.append("=" * 60)
         
         if not templates:
-            print("❌ No templates found")
+            lines.append("❌ No templates found")
             return
         
         for template_info in templates:
             if 'error' in template_info:
-                print(f"\n❌ {template_info['name']}")
-                print(f"   Error: {template_info['error']}")
+                lines.append(f"\n❌ {template_info['name']}")
+                lines.append(f"   Error: {template_info['error']}")
             else:
                 compatibility = template_info.get('agent_compatibility', {})
                 compat_status = "✅ Compatible" if compatibility.get('compatible', True) else "⚠️  Partial"
                 
-                print(f"\n{compat_status} {template_info['name']}")
-                print(f"   Description: {template_info['description']}")
-                print(f"   Phases: {template_info['phases_count']}")
-                print(f"   Agents: {template_info['agents_count']}")
+                lines.append(f"\n{compat_status} {template_info['name']}")
+                lines.append(f"   Description: {template_info['description']}")
+                lines.append(f"   Phases: {template_info['phases_count']}")
+                lines.append(f"   Agents: {template_info['agents_count']}")
                 
                 if not compatibility.get('compatible', True):
                     missing = compatibility.get('missing_agents', [])
-                    print(f"   Missing Agents: {', '.join(missing)}")
+                    lines.append(f"   Missing Agents: {', '.join(missing)}")
                 
                 if template_info.get('technology_stack'):
-                    print(f"   Technology: {', '.join(template_info['technology_stack'])}")
-                print(f"   Phases: {', '.join(template_info.get('phases', []))}")
+                    lines.append(f"   Technology: {', '.join(template_info['technology_stack'])}")
+                lines.append(f"   Phases: {', '.join(template_info.get('phases', []))}")
                 
     except Exception as e:
-        print(f"❌ Failed to list templates: {e}")
+        lines.append(f"❌ Failed to list templates: {e}")
+    finally:
+        _write_lines(lines)
 
 
 def list_agents(agents_dir: str = None):
     """利用可能なエージェント定義の一覧表示"""
-    from core.agent_loader import AgentLoader
-    
+    lines = []
     try:
-        loader = AgentLoader(agents_dir)
+        loader = _get_agent_loader(agents_dir)
         agents = loader.get_agents_summary()
         
-        print("👥 Available Agent Definitions")
-        print("=" * 60)
+        lines.append("👥 Available Agent Definitions")
+        lines.append("=" * 60)
         
         if not agents:
-            print("❌ No agent definitions found")
+            lines.append("❌ No agent definitions found")
             return
         
         for agent in agents:
-            print(f"\n✅ {agent['role']}")
-            print(f"   Display Name: {agent['display_name']}")
-            print(f"   Description: {agent['description']}")
-            print(f"   Expertise: {agent['expertise_count']} areas")
-            print(f"   Summary: {agent['expertise_summary']}")
+            lines.append(f"\n✅ {agent['role']}")
+            lines.append(f"   Display Name: {agent['display_name']}")
+            lines.append(f"   Description: {agent['description']}")
+            lines.append(f"   Expertise: {agent['expertise_count']} areas")
+            lines.append(f"   Summary: {agent['expertise_summary']}")
             if agent['specializations_count'] > 0:
-                print(f"   Specializations: {agent['specializations_count']}")
-            print(f"   Context Keywords: {agent['context_keywords_count']}")
+                lines.append(f"   Specializations: {agent['specializations_count']}")
+            lines.append(f"   Context Keywords: {agent['context_keywords_count']}")
                 
     except Exception as e:
-        print(f"❌ Failed to list agents: {e}")
+        lines.append(f"❌ Failed to list agents: {e}")
+    finally:
+        _write_lines(lines)
 
 
 def validate_template(template_name: str, templates_dir: str = None, agents_dir: str = None):
     """テンプレートの詳細検証"""
-    from core.template_loader import TemplateLoader, TemplateValidator
+    from core.template_loader import TemplateValidator
     
+    lines = []
     try:
-        loader = TemplateLoader(templates_dir, agents_dir)
+        loader = _get_template_loader(templates_dir, agents_dir)
         template = loader.load_template(template_name)
         validator = TemplateValidator()
         
-        print(f"🔍 Validating template: {template_name}")
-        print("=" * 50)
+        lines.append(f"🔍 Validating template: {template_name}")
+        lines.append("=" * 50)
         
         # 基本情報
-        print(f"✅ Template loaded successfully")
-        print(f"   Project: {template.name}")
-        print(f"   Tasks: {len(template.tasks)}")
-        print(f"   Agents: {len(template.agents)}")
+        lines.append(f"✅ Template loaded successfully")
+        lines.append(f"   Project: {template.name}")
+        lines.append(f"   Tasks: {len(template.tasks)}")
+        lines.append(f"   Agents: {len(template.agents)}")
         
         # エージェント互換性チェック
         agent_req_summary = loader.get_agent_requirements_summary(template_name)
         compatibility = agent_req_summary["compatibility"]
         
         if compatibility['compatible']:
-            print(f"\n✅ All required agent definitions are available")
+            lines.append(f"\n✅ All required agent definitions are available")
         else:
-            print(f"\n❌ Missing agent definitions:")
+            lines.append(f"\n❌ Missing agent definitions:")
             for agent in agent_req_summary["agent_details"]:
                 if not agent["available"]:
-                    print(f"   • {agent['role']}: {agent['description']}")
+                    lines.append(f"   • {agent['role']}: {agent['description']}")
         
-        print(f"\n📊 Agent Compatibility: {compatibility['coverage_percentage']:.1f}%")
+        lines.append(f"\n📊 Agent Compatibility: {compatibility['coverage_percentage']:.1f}%")
         
         # 依存関係検証
         dependency_errors = validator.validate_workflow_dependencies(template)
         if dependency_errors:
-            print(f"\n❌ Dependency errors found:")
+            lines.append(f"\n❌ Dependency errors found:")
             for error in dependency_errors:
-                print(f"   • {error}")
+                lines.append(f"   • {error}")
         else:
-            print(f"\n✅ Workflow dependencies are valid")
+            lines.append(f"\n✅ Workflow dependencies are valid")
         
         # 専門性検証
         expertise_warnings = validator.validate_agent_expertise_coverage(template)
         if expertise_warnings:
-            print(f"\n⚠️  Expertise coverage warnings:")
+            lines.append(f"\n⚠️  Expertise coverage warnings:")
             for warning in expertise_warnings:
-                print(f"   • {warning}")
+                lines.append(f"   • {warning}")
         else:
-            print(f"\n✅ Agent expertise coverage looks good")
+            lines.append(f"\n✅ Agent expertise coverage looks good")
         
         overall_valid = len(dependency_errors) == 0 and compatibility['compatible']
-        print(f"\n{'✅ Template is valid and ready to use' if overall_valid else '❌ Template has issues that need attention'}")
+        lines.append(f"\n{'✅ Template is valid and ready to use' if overall_valid else '❌ Template has issues that need attention'}")
         
     except Exception as e:
-        print(f"❌ Template validation failed: {e}")
+        lines.append(f"❌ Template validation failed: {e}")
+    finally:
+        _write_lines(lines)
 
 
 def validate_agents(agents_dir: str = None):
     """エージェント定義の詳細検証"""
-    from core.agent_loader import AgentLoader
-    
+    lines = []
     try:
-        loader = AgentLoader(agents_dir)
+        loader = _get_agent_loader(agents_dir)
         agents = loader.load_all_agents()
         
-        print(f"🔍 Validating agent definitions in: {agents_dir or TemplateConfig.DEFAULT_AGENTS_DIR}")
-        print("=" * 60)
+        lines.append(f"🔍 Validating agent definitions in: {agents_dir or TemplateConfig.DEFAULT_AGENTS_DIR}")
+        lines.append("=" * 60)
         
         if not agents:
-            print("❌ No agent definitions found")
+            lines.append("❌ No agent definitions found")
             return
         
-        print(f"✅ Found {len(agents)} agent definitions:")
+        lines.append(f"✅ Found {len(agents)} agent definitions:")
         
         for agent_def in agents.values():
-            print(f"\n👤 {agent_def.role} ({agent_def.display_name})")
-            print(f"   Description: {agent_def.description}")
-            print(f"   Expertise: {len(agent_def.expertise)} areas")
-            print(f"   Instructions: {len(agent_def.instructions)} characters")
-            print(f"   Context Keywords: {len(agent_def.context_keywords)}")
-            print(f"   Specializations: {len(agent_def.specializations)}")
-            print(f"   Collaboration: {len(agent_def.collaboration)}")
+            lines.append(f"\n👤 {agent_def.role} ({agent_def.display_name})")
+            lines.append(f"   Description: {agent_def.description}")
+            lines.append(f"   Expertise: {len(agent_def.expertise)} areas")
+            lines.append(f"   Instructions: {len(agent_def.instructions)} characters")
+            lines.append(f"   Context Keywords: {len(agent_def.context_keywords)}")
+            lines.append(f"   Specializations: {len(agent_def.specializations)}")
+            lines.append(f"   Collaboration: {len(agent_def.collaboration)}")
         
-        print(f"\n✅ All agent definitions are valid")
+        lines.append(f"\n✅ All agent definitions are valid")
         
     except Exception as e:
-        print(f"❌ Agent validation failed: {e}")
+        lines.append(f"❌ Agent validation failed: {e}")
+    finally:
+        _write_lines(lines)
 
 
 def replay_conversations(project_dir: str, limit: int = None, conversation_id: int = None, list_sessions: bool = False):
@@ -402,6 +479,8 @@ def replay_conversations(project_dir: str, limit: int = None, conversation_id: i
         conversation_id: 特定の会話IDのみ表示
         list_sessions: セッション一覧表示フラグ
     """
+    from core.conversation_replayer import ConversationReplayer
+    
     try:
         replayer = ConversationReplayer(project_dir)
         
@@ -418,25 +497,16 @@ def create_project_structure(project_dir: str):
     """プロジェクト構造の事前作成（最小限）"""
     project_path = Path(project_dir)
     
-    # 最小限のディレクトリ構造（ログ用のみ）
-    directories = [
-        "logs"  # ログ保存用ディレクトリのみ
-    ]
-    
-    for dir_name in directories:
-        (project_path / dir_name).mkdir(parents=True, exist_ok=True)
+    # 最小限のディレクトリ構造（ログ保存用ディレクトリのみ）
+    (project_path / "logs").mkdir(parents=True, exist_ok=True)
     
     print(f"📁 Project directory created: {project_path.resolve()}")
     print(f"   - logs/ (for session logs)")
     print("   - Other directories will be created by agents as needed")
 
 
-def main():
-    """メイン関数"""
-    parser = argparse.ArgumentParser(
-        description="Multi-Agent Development System with Template and Agent Support",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+# --help のエピローグ（使用例）
+_EPILOG = """
 Examples:
   python main.py                                    # Interactive template selection
   python main.py --template simple_todo           # Use specific template
@@ -461,6 +531,15 @@ Examples:
 Use --list-templates to see available project templates.
 Use --list-agents to see available agent definitions.
         """
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数パーサーの構築（プロセス内で一度だけ）"""
+    parser = argparse.ArgumentParser(
+        description="Multi-Agent Development System with Template and Agent Support",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG
     )
     
     parser.add_argument(
@@ -520,6 +599,18 @@ Use --list-agents to see available agent definitions.
         help="Only create project structure and exit"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not reuse template summaries within this run"
+    )
+    
+    parser.add_argument(
+        "--msgpack-summary",
+        action="store_true",
+        help="Save session summaries as msgpack instead of JSON (requires msgpack)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v", 
         action="store_true",
@@ -568,48 +659,36 @@ Use --list-agents to see available agent definitions.
         help="Maximum retry attempts per workflow block (default: 5)"
     )
     
-    args = parser.parse_args()
-    
-    # ログレベル調整
-    if args.verbose:
-        Config.LOG_LEVEL = "DEBUG"
-    
-    # ログ設定
-    setup_logging()
-    
-    print("🤖 Multi-Agent Development System")
-    print("=" * 60)
-    
-    # テンプレート一覧表示
-    if args.list_templates:
-        list_templates(args.templates_dir, args.agents_dir)
-        return
-    
-    # エージェント一覧表示
-    if args.list_agents:
-        list_agents(args.agents_dir)
-        return
-    
-    # テンプレート検証
-    if args.validate_template:
-        validate_template(args.validate_template, args.templates_dir, args.agents_dir)
-        return
-    
-    # エージェント検証
-    if args.validate_agents:
-        validate_agents(args.agents_dir)
-        return
-    
-    # 会話再現・セッション管理
-    if args.replay_conversations or args.list_sessions:
-        replay_conversations(
-            args.project_dir, 
-            limit=args.replay_limit,
-            conversation_id=args.replay_id,
-            list_sessions=args.list_sessions
-        )
-        return
-    
+    return parser
+
+
+def _cmd_list_templates(args):
+    list_templates(args.templates_dir, args.agents_dir)
+
+
+def _cmd_list_agents(args):
+    list_agents(args.agents_dir)
+
+
+def _cmd_validate_template(args):
+    validate_template(args.validate_template, args.templates_dir, args.agents_dir)
+
+
+def _cmd_validate_agents(args):
+    validate_agents(args.agents_dir)
+
+
+def _cmd_replay(args):
+    replay_conversations(
+        args.project_dir, 
+        limit=args.replay_limit,
+        conversation_id=args.replay_id,
+        list_sessions=args.list_sessions
+    )
+
+
+def _cmd_run(args):
+    """環境チェックから開発ワークフロー実行まで"""
     # 環境チェック（dry-runの場合はClaude CLIチェックをスキップ）
     if not args.dry_run and not validate_environment():
         sys.exit(1)
@@ -623,8 +702,17 @@ Use --list-agents to see available agent definitions.
         return
     
     # 開発ワークフロー実行
+    import asyncio
+    
+    # uvloop があれば高速なイベントループで実行（Windows・未インストール時は標準ループ）
+    # uvloop.install() はポリシーを差し替える非推奨の方法のため、uvloop.run を使う
     try:
-        success = asyncio.run(run_development_workflow(
+        from uvloop import run as run_event_loop
+    except ImportError:
+        run_event_loop = asyncio.run
+    
+    try:
+        success = run_event_loop(run_development_workflow(
             args.project_dir, 
             args.template,
             args.templates_dir,
@@ -644,5 +732,47 @@ Use --list-agents to see available agent definitions.
         sys.exit(1)
 
 
+# 単発コマンドのフラグ -> ハンドラー（上から優先）
+_COMMANDS = (
+    ("list_templates", _cmd_list_templates),
+    ("list_agents", _cmd_list_agents),
+    ("validate_template", _cmd_validate_template),
+    ("validate_agents", _cmd_validate_agents),
+    ("replay_conversations", _cmd_replay),
+    ("list_sessions", _cmd_replay),
+)
+
+
+def main():
+    """メイン関数"""
+    args = _build_parser().parse_args()
+    
+    # ログレベル調整
+    if args.verbose:
+        Config.LOG_LEVEL = "DEBUG"
+    
+    # テンプレートサマリーのキャッシュの無効化
+    if args.no_cache:
+        TemplateConfig.CACHE_LOADERS = False
+    
+    # セッションサマリーの保存形式
+    if args.msgpack_summary:
+        Config.SESSION_SUMMARY_MSGPACK = True
+    
+    # ログ設定
+    setup_logging()
+    
+    print("🤖 Multi-Agent Development System")
+    print("=" * 60)
+    
+    # 単発コマンド（指定された最初のフラグのハンドラーのみ実行）、なければワークフロー実行
+    for flag, handler in _COMMANDS:
+        if getattr(args, flag):
+            handler(args)
+            return
+    
+    _cmd_run(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,8 @@
+"""
+Python version compatibility helpers for data models
+"""
+
+import sys
+
+# Python 3.10+ では slots=True でインスタンスごとの __dict__ を省く（3.8/3.9 では通常のデータクラス）
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
@@ -2,12 +2,47 @@
 Logging related data models for multi-agent system
 """
 
+import json
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict
+from types import MappingProxyType
+from typing import List, Optional, Dict, Mapping, Sequence
 
+from .compat import DATACLASS_SLOTS
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# 未使用時に共有する不変の空コンテナ（ログ1件ごとの空 list/dict 生成を避ける）
+EMPTY_SEQUENCE: tuple = ()
+EMPTY_DETAILS: Mapping = MappingProxyType({})
+
+
+def _orjson_default(obj):
+    """orjson が直接扱えない型の変換"""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError
+
+
+def _dumps_log(log) -> bytes:
+    """ログデータクラスをUTF-8のJSONバイト列に変換"""
+    if ORJSON_AVAILABLE:
+        # orjson はデータクラスと datetime を直接シリアライズできる
+        return orjson.dumps(log, default=_orjson_default)
+    return json.dumps(log.to_dict(), ensure_ascii=False).encode('utf-8')
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AgentExecutionLog:
     """エージェント実行ログ"""
     agent_role: str
@@ -18,72 +53,104 @@ class AgentExecutionLog:
     prompt_length: int = 0
     context_files_count: int = 0
     output_length: int = 0
-    artifacts_created: List[str] = field(default_factory=list)
-    claude_code_commands: List[str] = field(default_factory=list)
+    artifacts_created: Sequence[str] = EMPTY_SEQUENCE
+    claude_code_commands: Sequence[str] = EMPTY_SEQUENCE
     error_message: Optional[str] = None
     execution_time_seconds: float = 0.0
+    # 開始時刻のISO文字列キャッシュ（end_time は後から設定されるため対象外）
+    _start_time_iso: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._start_time_iso = self.start_time.isoformat()
+    
+    def add_claude_code_command(self, command: str):
+        """Claude Codeコマンドを追加（初回追加時にリストを確保）"""
+        if self.claude_code_commands is EMPTY_SEQUENCE:
+            self.claude_code_commands = []
+        self.claude_code_commands.append(command)
     
     def to_dict(self) -> Dict:
         """辞書形式に変換"""
         return {
             "agent_role": self.agent_role,
             "task_id": self.task_id,
-            "start_time": self.start_time.isoformat(),
+            "start_time": self._start_time_iso,
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "status": self.status,
             "prompt_length": self.prompt_length,
             "context_files_count": self.context_files_count,
             "output_length": self.output_length,
-            "artifacts_created": self.artifacts_created,
-            "claude_code_commands": self.claude_code_commands,
+            "artifacts_created": list(self.artifacts_created),
+            "claude_code_commands": list(self.claude_code_commands),
             "error_message": self.error_message,
             "execution_time_seconds": self.execution_time_seconds
         }
+    
+    def to_json(self) -> bytes:
+        """JSONバイト列に変換"""
+        return _dumps_log(self)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class InteractionLog:
     """エージェント間相互作用ログ"""
     timestamp: datetime
     from_agent: str
     to_agent: str
     interaction_type: str  # context_sharing, dependency, review, artifact_creation
-    files_shared: List[str] = field(default_factory=list)
+    files_shared: Sequence[str] = EMPTY_SEQUENCE
     message: str = ""
+    _timestamp_iso: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._timestamp_iso = self.timestamp.isoformat()
     
     def to_dict(self) -> Dict:
         """辞書形式に変換"""
         return {
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self._timestamp_iso,
             "from_agent": self.from_agent,
             "to_agent": self.to_agent,
             "interaction_type": self.interaction_type,
-            "files_shared": self.files_shared,
+            "files_shared": list(self.files_shared),
             "message": self.message
         }
+    
+    def to_json(self) -> bytes:
+        """JSONバイト列に変換"""
+        return _dumps_log(self)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class SystemLog:
     """システム全体ログ"""
     timestamp: datetime
     level: str  # info, warning, error
     component: str
     message: str
-    details: Dict = field(default_factory=dict)
+    # mappingproxy はハッシュ不可で default に指定できないため、共有インスタンスを返すファクトリを使用
+    details: Mapping = field(default_factory=lambda: EMPTY_DETAILS)
+    _timestamp_iso: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._timestamp_iso = self.timestamp.isoformat()
     
     def to_dict(self) -> Dict:
         """辞書形式に変換"""
         return {
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self._timestamp_iso,
             "level": self.level,
             "component": self.component,
             "message": self.message,
-            "details": self.details
+            "details": dict(self.details)
         }
+    
+    def to_json(self) -> bytes:
+        """JSONバイト列に変換"""
+        return _dumps_log(self)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class SessionSummary:
     """セッション全体のサマリー"""
     session_id: str
@@ -98,6 +165,12 @@ class SessionSummary:
     total_interactions: int
     error_count: int
     claude_code_commands_count: int
+    _start_time_iso: str = field(default="", init=False, repr=False, compare=False)
+    _end_time_iso: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._start_time_iso = self.start_time.isoformat()
+        self._end_time_iso = self.end_time.isoformat()
     
     @property
     def success_rate(self) -> float:
@@ -110,8 +183,8 @@ class SessionSummary:
         """辞書形式に変換"""
         return {
             "session_id": self.session_id,
-            "start_time": self.start_time.isoformat(),
-            "end_time": self.end_time.isoformat(),
+            "start_time": self._start_time_iso,
+            "end_time": self._end_time_iso,
             "total_execution_time_seconds": self.total_execution_time_seconds,
             "total_tasks": self.total_tasks,
             "successful_tasks": self.successful_tasks,
@@ -123,3 +196,13 @@ class SessionSummary:
             "error_count": self.error_count,
             "claude_code_commands_count": self.claude_code_commands_count
         }
+    
+    def to_json(self) -> bytes:
+        """JSONバイト列に変換（success_rate を含めるため to_dict 経由）"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode('utf-8')
+    
+    def to_msgpack(self) -> bytes:
+        """msgpackバイト列に変換（アーカイブ用のコンパクトな形式）"""
+        return msgpack.packb(self.to_dict(), use_bin_type=True)
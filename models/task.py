@@ -2,10 +2,13 @@
 Task related data models for multi-agent system
 """
 
+import time
 from dataclasses import dataclass, field
+from itertools import count
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
+from .compat import DATACLASS_SLOTS
 from .log import AgentExecutionLog
 
 
@@ -17,7 +20,16 @@ class AgentRole(Enum):
     SECURITY_ENGINEER = "security_engineer"
 
 
-@dataclass
+# プロセス内で単調増加する連番（同一ミリ秒内のタスクIDの重複を防ぐ）
+_task_seq = count()
+
+
+def generate_task_id(role: AgentRole) -> str:
+    """ロール名・ミリ秒タイムスタンプ・連番からタスクIDを生成"""
+    return f"{role.value}_{int(time.time() * 1000)}_{next(_task_seq)}"
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AgentTask:
     """エージェントが実行するタスクの定義"""
     role: AgentRole
@@ -30,11 +42,10 @@ class AgentTask:
     def __post_init__(self):
         """Post initialization processing"""
         if not self.task_id:
-            import time
-            self.task_id = f"{self.role.value}_{int(time.time())}"
+            self.task_id = generate_task_id(self.role)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AgentResult:
     """エージェントタスクの実行結果"""
     role: AgentRole
@@ -50,7 +61,7 @@ class AgentResult:
     
     @property
     def execution_time(self) -> float:
-        """実行時間を取得"""
+        """実行時間を取得（実行ログの差し替え・更新を反映するため毎回参照する）"""
         if self.execution_log:
             return self.execution_log.execution_time_seconds
         return 0.0
@@ -62,9 +73,9 @@ class AgentResult:
     
     def summary(self) -> str:
         """結果サマリー"""
-        duration_text = f" ({self.execution_time:.1f}s)" if self.execution_time > 0 else ""
+        execution_time = self.execution_time
+        duration_text = f" ({execution_time:.1f}s)" if execution_time > 0 else ""
         artifacts_text = f", created {len(self.artifacts)} files" if self.artifacts else ""
-        
         retry_text = f" (retry {self.retry_count})" if self.retry_count > 0 else ""
         return f"{self.status_emoji} {self.role.value}{duration_text}{artifacts_text}{retry_text}"
     
@@ -74,7 +85,7 @@ class AgentResult:
         self.retry_reason = reason
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class PhaseRetryTracker:
     """Cross-phase retry tracking for bug fixing workflow"""
     phase_name: str
@@ -97,7 +108,7 @@ class PhaseRetryTracker:
             "attempt": self.retry_count,
             "triggered_by": triggered_by,
             "reason": reason,
-            "timestamp": __import__('time').time()
+            "timestamp": time.time()
         })
     
     def get_retry_summary(self) -> str:
@@ -0,0 +1,25 @@
+"""
+セッションサマリーの保存・読み込みのテスト
+"""
+
+import pytest
+
+from core.conversation_replayer import ConversationReplayer
+from core.log_manager import LogManager
+from models.log import MSGPACK_AVAILABLE
+
+
+@pytest.mark.parametrize('msgpack_summary', [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not MSGPACK_AVAILABLE, reason='msgpack is not installed')),
+])
+def test_session_summary_round_trip(tmp_path, msgpack_summary):
+    """LogManager が保存したサマリーを ConversationReplayer が同じ内容で読み込む"""
+    log_manager = LogManager(str(tmp_path / 'logs'), msgpack_summary=msgpack_summary)
+    log_manager.log_system_event('error', 'test', 'failed')
+    summary = log_manager.generate_session_summary()
+    
+    assert log_manager.summary_file.suffix == ('.msgpack' if msgpack_summary else '.json')
+    loaded = ConversationReplayer(str(tmp_path)).load_session_summary(log_manager.summary_file.parent)
+    assert loaded == summary.to_dict()
+    assert loaded['error_count'] == 1
@@ -5,11 +5,22 @@ Flask ToDo アプリケーション メインファイル
 
 import logging
 import os
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+import sqlite3
+from datetime import date
+from logging.handlers import MemoryHandler, RotatingFileHandler
+from functools import lru_cache, wraps
+from typing import Optional
+from flask import (Flask, Response, current_app, render_template, request, jsonify,
+                   redirect, url_for, flash, has_request_context)
+from jinja2 import FileSystemBytecodeCache
 from werkzeug.exceptions import HTTPException
 from config import get_config
-from database import init_database
+from database import init_database, close_db
+from http_cache import etag_page, make_etag, not_modified
+from json_provider import init_json_provider, list_response
 from models import Todo, Category
+from models.todo import UPDATABLE_FIELDS, parse_iso_date
+from streaming import stream_page
 
 
 def create_app(config_name: str = None) -> Flask:
@@ -20,11 +31,15 @@ def create_app(config_name: str = None) -> Flask:
     config = get_config(config_name)
     app.config.from_object(config)
     
+    # JSONシリアライザー設定（orjson があれば使用）
+    init_json_provider(app)
+    
     # ログ設定
     setup_logging(app)
     
     # データベース初期化
-    init_database(app.config['DATABASE_PATH'])
+    init_database(app.config['DATABASE_PATH'], app.config['DATABASE_POOL_SIZE'])
+    app.teardown_appcontext(close_db)
     
     # ルート登録
     register_routes(app)
@@ -35,26 +50,119 @@ def create_app(config_name: str = None) -> Flask:
     # テンプレートフィルター登録
     register_template_filters(app)
     
+    # テンプレートのキャッシュ設定
+    setup_templates(app)
+    
     return app
 
 
 def setup_logging(app: Flask):
     """ログ設定"""
     if not app.debug:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = RotatingFileHandler(
+            app.config['LOG_FILE'],
+            maxBytes=app.config['LOG_MAX_BYTES'],
+            backupCount=app.config['LOG_BACKUP_COUNT'],
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        # レコードごとの書き込みを避け、バッファが溜まるか ERROR 以上で書き出す
+        buffered_handler = MemoryHandler(
+            app.config['LOG_BUFFER_CAPACITY'],
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
         logging.basicConfig(
             level=getattr(logging, app.config['LOG_LEVEL']),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(app.config['LOG_FILE']),
-                logging.StreamHandler()
-            ]
+            handlers=[buffered_handler, stream_handler]
         )
 
 
+def setup_templates(app: Flask):
+    """テンプレートのバイトコードキャッシュを設定し、起動時にコンパイルしておく"""
+    # ディレクトリ未指定時は Jinja の既定の一時ディレクトリを使用
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_CACHE_DIR'])
+    # URL の生成結果はアプリケーションごとの URL マップ・設定に依存するため、キャッシュはアプリ単位で持つ
+    app.extensions['url_for_cache'] = lru_cache(maxsize=URL_CACHE_SIZE)(_build_url)
+    app.jinja_env.globals['url_for'] = cached_url_for
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+
+# アプリケーションごとに保持するURL生成結果の数
+URL_CACHE_SIZE = 4096
+
+
+def _build_url(url_root: str, blueprint: Optional[str], endpoint: str, values: frozenset) -> str:
+    """URLを生成（引数はアプリごとのキャッシュのキー）"""
+    return url_for(endpoint, **dict(values))
+
+
+def cached_url_for(endpoint: str, **values) -> str:
+    """テンプレート用の url_for（一覧のリンクなど繰り返し呼ばれるURL生成をキャッシュ）"""
+    # 生成結果はホスト・スクリプトルートと相対エンドポイントの解決先の blueprint に依存する
+    url_cache = current_app.extensions.get('url_for_cache') if has_request_context() else None
+    if url_cache is None:
+        return url_for(endpoint, **values)
+    try:
+        key = frozenset(values.items())
+    except TypeError:
+        # リスト値などハッシュできない引数はキャッシュしない
+        return url_for(endpoint, **values)
+    return url_cache(request.url_root, request.blueprint, endpoint, key)
+
+
+# 期限日の形式エラーのメッセージ
+DATE_FORMAT_ERROR = '日付形式が正しくありません（YYYY-MM-DD）'
+
+
+def get_pagination_args(default_per_page: int, max_per_page: int = 100):
+    """ページネーションパラメータ（page, per_page, offset）を取得"""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    per_page = min(max(per_page, 1), max_per_page)
+    return page, per_page, (page - 1) * per_page
+
+
+def api_errors(func):
+    """APIルートの例外をログに記録し、JSONエラーレスポンスに変換するデコレーター"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.IntegrityError as e:
+            # 存在しないカテゴリの指定は外部キー制約で検出し、制約の詳細はログにのみ記録する
+            current_app.logger.warning("Integrity error in %s: %s", func.__name__, e)
+            return jsonify({'success': False, 'error': '指定されたカテゴリが存在しません'}), 400
+        except Exception as e:
+            # ログレベルで除外される場合はメッセージを組み立てない
+            current_app.logger.exception("Error in %s", func.__name__)
+            return jsonify({'success': False, 'error': str(e)}), 500
+    return wrapper
+
+
+def todos_page_response(todos, pagination: dict) -> Response:
+    """1ページ分のTodoのJSONレスポンスを作成（1ページは最大100件）"""
+    category_map = {}
+    today = date.today()
+
+    def items():
+        for todo in todos:
+            if todo._category is not None:
+                category_map[todo.category_id] = todo._category
+            yield todo.to_dict_with_category(category_map, today)
+
+    return list_response(items(), pagination)
+
+
 def register_routes(app: Flask):
     """ルート登録"""
     
     @app.route('/')
+    @etag_page(lambda: (Todo.fingerprint(), Category.fingerprint(), date.today()), cache_page=True)
     def index():
         """メインページ"""
         try:
@@ -67,11 +175,12 @@ def register_routes(app: Flask):
                                  categories=categories, 
                                  stats=stats)
         except Exception as e:
-            app.logger.error(f"Error in index route: {str(e)}")
+            app.logger.error("Error in index route: %s", e)
             flash('データの取得中にエラーが発生しました', 'error')
             return render_template('index.html', todos=[], categories=[], stats={})
     
     @app.route('/todos')
+    @etag_page(lambda: (Todo.fingerprint(), Category.fingerprint(), date.today()), cache_page=True)
     def todos():
         """Todo一覧ページ"""
         try:
@@ -79,195 +188,197 @@ def register_routes(app: Flask):
             status = request.args.get('status')
             category_id = request.args.get('category_id', type=int)
             priority = request.args.get('priority')
+            page, per_page, offset = get_pagination_args(app.config['TODOS_PER_PAGE'])
             
-            todos = Todo.get_all(status=status, category_id=category_id, priority=priority)
+            # Todoはカーソルから読みながら描画する
+            todos, total = Todo.iter_page(status=status, category_id=category_id, priority=priority,
+                                          limit=per_page, offset=offset)
             categories = Category.get_all()
+            context = dict(todos=todos,
+                           categories=categories,
+                           current_status=status,
+                           current_category=category_id,
+                           current_priority=priority,
+                           page=page,
+                           per_page=per_page,
+                           total=total)
             
-            return render_template('todo_list.html', 
-                                 todos=todos, 
-                                 categories=categories,
-                                 current_status=status,
-                                 current_category=category_id,
-                                 current_priority=priority)
+            # 絞り込み・ページ指定時はHTMLを順次送信する
+            # 既定の表示は一括で描画し、etag_page が描画結果を保持する
+            if request.args:
+                return stream_page('todo_list.html', 'Todo一覧の表示中にエラーが発生しました', **context)
+            return render_template('todo_list.html', **context)
         except Exception as e:
-            app.logger.error(f"Error in todos route: {str(e)}")
+            app.logger.error("Error in todos route: %s", e)
             flash('Todo一覧の取得中にエラーが発生しました', 'error')
             return render_template('todo_list.html', todos=[], categories=[])
     
     # API Routes
     @app.route('/api/todos', methods=['GET'])
+    @api_errors
     def api_get_todos():
         """Todo一覧取得API"""
-        try:
-            status = request.args.get('status')
-            category_id = request.args.get('category_id', type=int)
-            priority = request.args.get('priority')
-            
-            todos = Todo.get_all(status=status, category_id=category_id, priority=priority)
-            
-            return jsonify({
-                'success': True,
-                'data': [todo.to_dict(include_category=True) for todo in todos],
-                'count': len(todos)
-            })
-        except Exception as e:
-            app.logger.error(f"Error in API get todos: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        status = request.args.get('status')
+        category_id = request.args.get('category_id', type=int)
+        priority = request.args.get('priority')
+        page, per_page, offset = get_pagination_args(app.config['TODOS_PER_PAGE'])
+        
+        # 件数は変更検知用のクエリで取得し、未変更ならJSONを組み立てずに返す
+        # 各行の is_overdue / is_due_today は日付で変わるため今日の日付も含める
+        revision, total = Todo.fingerprint(status=status, category_id=category_id, priority=priority)
+        etag = make_etag(revision, total, Category.fingerprint(), date.today())
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        todos = Todo.iter_all(status=status, category_id=category_id, priority=priority,
+                              limit=per_page, offset=offset)
+        
+        # カテゴリは一覧クエリで結合済みのため、行ごとの追加クエリなしで変換
+        response = todos_page_response(todos, {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': (total + per_page - 1) // per_page
+        })
+        response.set_etag(etag)
+        return response
     
     @app.route('/api/todos', methods=['POST'])
+    @api_errors
     def api_create_todo():
         """Todo作成API"""
-        try:
-            data = request.get_json()
-            
-            # バリデーション
-            if not data or not data.get('title'):
-                return jsonify({'success': False, 'error': 'タイトルは必須です'}), 400
-            
-            # Todo作成
-            todo = Todo(
-                title=data['title'],
-                description=data.get('description', ''),
-                category_id=data.get('category_id'),
-                priority=data.get('priority', 'medium'),
-                status=data.get('status', 'pending'),
-                due_date=data.get('due_date')
-            )
-            
-            todo_id = todo.save()
-            todo = Todo.get_by_id(todo_id)
-            
-            return jsonify({
-                'success': True,
-                'data': todo.to_dict(include_category=True),
-                'message': 'Todoが作成されました'
-            }), 201
-            
-        except Exception as e:
-            app.logger.error(f"Error in API create todo: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        data = request.get_json()
+        
+        # バリデーション
+        if not data or not data.get('title'):
+            return jsonify({'success': False, 'error': 'タイトルは必須です'}), 400
+        
+        # 日付変換（不正な値は保存前に拒否する）
+        due_date = None
+        if data.get('due_date'):
+            due_date = parse_iso_date(data['due_date'])
+            if due_date is None:
+                return jsonify({'success': False, 'error': DATE_FORMAT_ERROR}), 400
+        
+        # Todo作成
+        todo = Todo(
+            title=data['title'],
+            description=data.get('description', ''),
+            category_id=data.get('category_id'),
+            priority=data.get('priority', 'medium'),
+            status=data.get('status', 'pending'),
+            due_date=due_date
+        )
+        
+        todo.save()
+        todo.load_category()
+        
+        return jsonify({
+            'success': True,
+            'data': todo.to_dict(include_category=True),
+            'message': 'Todoが作成されました'
+        }), 201
     
     @app.route('/api/todos/<int:todo_id>', methods=['GET'])
+    @api_errors
     def api_get_todo(todo_id: int):
         """Todo詳細取得API"""
-        try:
-            todo = Todo.get_by_id(todo_id)
-            if not todo:
-                return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
-            
-            return jsonify({
-                'success': True,
-                'data': todo.to_dict(include_category=True)
-            })
-        except Exception as e:
-            app.logger.error(f"Error in API get todo: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        todo = Todo.get_by_id(todo_id)
+        if not todo:
+            return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
+        
+        return jsonify({
+            'success': True,
+            'data': todo.to_dict(include_category=True)
+        })
     
     @app.route('/api/todos/<int:todo_id>', methods=['PUT'])
+    @api_errors
     def api_update_todo(todo_id: int):
         """Todo更新API"""
-        try:
-            todo = Todo.get_by_id(todo_id)
-            if not todo:
-                return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
-            
-            data = request.get_json()
-            
-            # データ更新
-            if 'title' in data:
-                todo.title = data['title']
-            if 'description' in data:
-                todo.description = data['description']
-            if 'category_id' in data:
-                todo.category_id = data['category_id']
-            if 'priority' in data:
-                todo.priority = data['priority']
-            if 'status' in data:
-                todo.status = data['status']
-            if 'due_date' in data:
-                todo.due_date = data['due_date']
-            
-            todo.save()
-            
-            return jsonify({
-                'success': True,
-                'data': todo.to_dict(include_category=True),
-                'message': 'Todoが更新されました'
-            })
-            
-        except Exception as e:
-            app.logger.error(f"Error in API update todo: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        todo = Todo.get_by_id(todo_id)
+        if not todo:
+            return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
+        
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'データが必要です'}), 400
+        
+        # 送信された項目のみ更新
+        updates = {key: data[key] for key in UPDATABLE_FIELDS if key in data}
+        if updates.get('due_date'):
+            updates['due_date'] = parse_iso_date(updates['due_date'])
+            if updates['due_date'] is None:
+                return jsonify({'success': False, 'error': DATE_FORMAT_ERROR}), 400
+        elif 'due_date' in updates:
+            updates['due_date'] = None
+        
+        todo.update_fields(updates)
+        todo.load_category()
+        
+        return jsonify({
+            'success': True,
+            'data': todo.to_dict(include_category=True),
+            'message': 'Todoが更新されました'
+        })
     
     @app.route('/api/todos/<int:todo_id>', methods=['DELETE'])
+    @api_errors
     def api_delete_todo(todo_id: int):
         """Todo削除API"""
-        try:
-            todo = Todo.get_by_id(todo_id)
-            if not todo:
-                return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
-            
-            todo.delete()
-            
-            return jsonify({
-                'success': True,
-                'message': 'Todoが削除されました'
-            })
-            
-        except Exception as e:
-            app.logger.error(f"Error in API delete todo: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        if not Todo.delete_by_id(todo_id):
+            return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
+        
+        return jsonify({
+            'success': True,
+            'message': 'Todoが削除されました'
+        })
     
     @app.route('/api/todos/<int:todo_id>/toggle', methods=['POST'])
+    @api_errors
     def api_toggle_todo(todo_id: int):
         """Todo完了状態切り替えAPI"""
-        try:
-            todo = Todo.get_by_id(todo_id)
-            if not todo:
-                return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
-            
-            if todo.status == 'completed':
-                todo.mark_pending()
-                message = 'Todoを未完了にしました'
-            else:
-                todo.mark_completed()
-                message = 'Todoを完了にしました'
-            
-            return jsonify({
-                'success': True,
-                'data': todo.to_dict(include_category=True),
-                'message': message
-            })
-            
-        except Exception as e:
-            app.logger.error(f"Error in API toggle todo: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        # 存在確認と切り替えを1つのUPDATE文で行う
+        status = Todo.toggle(todo_id)
+        if status is None:
+            return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
+        
+        todo = Todo.get_by_id(todo_id)
+        message = 'Todoを完了にしました' if status == 'completed' else 'Todoを未完了にしました'
+        
+        return jsonify({
+            'success': True,
+            'data': todo.to_dict(include_category=True),
+            'message': message
+        })
     
     @app.route('/api/categories', methods=['GET'])
+    @api_errors
     def api_get_categories():
         """カテゴリ一覧取得API"""
-        try:
-            categories = Category.get_all()
-            return jsonify({
-                'success': True,
-                'data': [category.to_dict() for category in categories]
-            })
-        except Exception as e:
-            app.logger.error(f"Error in API get categories: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        etag = make_etag(Category.fingerprint())
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        categories = Category.get_all()
+        response = jsonify({
+            'success': True,
+            'data': [category.to_dict() for category in categories]
+        })
+        response.set_etag(etag)
+        return response
     
     @app.route('/api/statistics', methods=['GET'])
+    @api_errors
     def api_get_statistics():
         """統計情報取得API"""
-        try:
-            stats = Todo.get_statistics()
-            return jsonify({
-                'success': True,
-                'data': stats
-            })
-        except Exception as e:
-            app.logger.error(f"Error in API get statistics: {str(e)}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+        stats = Todo.get_statistics()
+        return jsonify({
+            'success': True,
+            'data': stats
+        })
 
 
 def register_error_handlers(app: Flask):
@@ -290,47 +401,59 @@ def register_error_handlers(app: Flask):
         if isinstance(e, HTTPException):
             return e
         
-        app.logger.error(f"Unhandled exception: {str(e)}")
+        app.logger.error("Unhandled exception: %s", e)
         if request.path.startswith('/api/'):
             return jsonify({'success': False, 'error': 'サーバーエラーが発生しました'}), 500
         return render_template('errors/500.html'), 500
 
 
+# テンプレートフィルター用の表示テーブル（描画ごとに作り直さないようモジュールで保持）
+PRIORITY_LABELS = {
+    'low': '低',
+    'medium': '中',
+    'high': '高'
+}
+
+STATUS_LABELS = {
+    'pending': '未完了',
+    'in_progress': '進行中',
+    'completed': '完了'
+}
+
+PRIORITY_CLASSES = {
+    'low': 'text-success',
+    'medium': 'text-warning',
+    'high': 'text-danger'
+}
+
+
+def priority_label(priority):
+    """優先度ラベル"""
+    return PRIORITY_LABELS.get(priority, priority)
+
+
+def status_label(status):
+    """ステータスラベル"""
+    return STATUS_LABELS.get(status, status)
+
+
+def priority_class(priority):
+    """優先度CSSクラス"""
+    return PRIORITY_CLASSES.get(priority, '')
+
+
 def register_template_filters(app: Flask):
-    """テンプレートフィルター登録"""
-    
-    @app.template_filter('priority_label')
-    def priority_label(priority):
-        """優先度ラベル"""
-        labels = {
-            'low': '低',
-            'medium': '中',
-            'high': '高'
-        }
-        return labels.get(priority, priority)
-    
-    @app.template_filter('status_label')
-    def status_label(status):
-        """ステータスラベル"""
-        labels = {
-            'pending': '未完了',
-            'in_progress': '進行中',
-            'completed': '完了'
-        }
-        return labels.get(status, status)
-    
-    @app.template_filter('priority_class')
-    def priority_class(priority):
-        """優先度CSSクラス"""
-        classes = {
-            'low': 'text-success',
-            'medium': 'text-warning',
-            'high': 'text-danger'
-        }
-        return classes.get(priority, '')
+    """テンプレートフィルター登録（モジュールレベルの関数を登録し、アプリ生成ごとにクロージャを作らない）"""
+    app.add_template_filter(priority_label, 'priority_label')
+    app.add_template_filter(status_label, 'status_label')
+    app.add_template_filter(priority_class, 'priority_class')
 
 
 if __name__ == '__main__':
+    # 開発サーバーは開発環境でのみ使用（本番は gunicorn -c gunicorn.conf.py wsgi:application）
+    if os.environ.get('FLASK_ENV', 'development') not in ('development', 'default'):
+        raise SystemExit("Use a production WSGI server: gunicorn -c gunicorn.conf.py wsgi:application")
+    
     # アプリケーション作成
     app = create_app()
     
@@ -0,0 +1,66 @@
+"""
+インプロセスキャッシュモジュール
+集計結果など頻繁に読まれるデータをTTL付きで保持する
+"""
+
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """有効期限付きのシンプルなキャッシュ"""
+
+    def __init__(self):
+        # key -> (有効期限, 値)
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """値を取得（見つかったかどうかと値のタプル）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            return True, entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """値を保存"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, name: str):
+        """指定した名前で登録されたエントリをすべて削除"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == name]:
+                del self._entries[key]
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+
+
+# アプリケーション全体で共有するキャッシュ
+cache = TTLCache()
+
+
+def memoize(name: str, ttl: float = 30) -> Callable:
+    """関数の戻り値を引数ごとにTTL付きでキャッシュするデコレーター"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # 同じ名前で複数の関数を登録しても衝突しないよう関数名もキーに含める
+            key = (name, func.__qualname__, args, frozenset(kwargs.items()))
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
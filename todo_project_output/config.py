@@ -19,6 +19,8 @@ class Config:
     
     # データベース設定
     DATABASE_PATH = os.environ.get('DATABASE_PATH') or 'todo_app.db'
+    # 保持する接続数（同時に処理するリクエスト数に合わせる）
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 8))
     
     # デバッグモード
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 'yes']
@@ -33,12 +35,19 @@ class Config:
     # ページネーション
     TODOS_PER_PAGE = int(os.environ.get('TODOS_PER_PAGE', 20))
     
+    # テンプレート設定（本番では変更検知を行わずコンパイル済みテンプレートを使い回す）
+    TEMPLATES_AUTO_RELOAD = DEBUG
+    JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR')
+    
     # API設定
     API_RATE_LIMIT = os.environ.get('API_RATE_LIMIT', '100/hour')
     
     # ログ設定
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'todo_app.log')
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # ローテーションするサイズ
+    LOG_BACKUP_COUNT = 5
+    LOG_BUFFER_CAPACITY = 100  # まとめて書き込むレコード数（ERROR 以上は即時書き込み）
     
     # セキュリティ設定
     WTF_CSRF_ENABLED = True
@@ -52,6 +61,7 @@ class Config:
 class DevelopmentConfig(Config):
     """開発環境設定"""
     DEBUG = True
+    TEMPLATES_AUTO_RELOAD = True
     DATABASE_PATH = 'todo_app_dev.db'
     LOG_LEVEL = 'DEBUG'
 
@@ -67,6 +77,7 @@ class TestingConfig(Config):
 class ProductionConfig(Config):
     """本番環境設定"""
     DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False
     DATABASE_PATH = os.environ.get('DATABASE_PATH') or '/app/data/todo_app.db'
     
     # 本番環境では必須の設定チェック
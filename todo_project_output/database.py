@@ -4,9 +4,189 @@ SQLiteデータベースの初期化、接続管理を行う
 """
 
 import sqlite3
-import os
+import threading
+from collections import namedtuple
 from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
+from flask import g, has_app_context
+
+# データベースファイルに保存されるPRAGMA（起動時に一度だけ適用）
+# WAL で書き込み中も読み込みを並行可能にする
+DATABASE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+)
+
+# 接続ごとに適用するPRAGMA
+CONNECTION_PRAGMAS = (
+    'PRAGMA foreign_keys=ON',  # カテゴリの存在確認と削除時の SET NULL をDB側で行う
+    'PRAGMA synchronous=NORMAL',  # WAL では NORMAL でも破損しない（コミットごとの fsync を省く）
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',  # 最大 64MB
+    'PRAGMA mmap_size=268435456',  # 256MB までメモリマップで読み込み
+)
+
+# 接続ごとのプリペアドステートメントキャッシュ数（同一SQL文字列の再パースを避ける）
+STATEMENT_CACHE_SIZE = 256
+
+# 一覧の絞り込み・並び順用インデックス（既存のデータベースにも起動時に追加する）
+LIST_ORDER_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_todos_order ON todos(display_order, created_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_todos_status_order ON todos(status, display_order, created_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_todos_category_order ON todos(category_id, display_order, created_at DESC)',
+    # ステータスで絞り込み、作成日時で並び替える一覧用
+    'CREATE INDEX IF NOT EXISTS idx_todos_status_created ON todos(status, created_at)',
+)
+
+# ステータス・優先度ごとの件数をトリガーで維持する集計テーブル
+# （統計情報は todos を走査せずこのテーブルの数行から求める。NULL は '' として数える）
+TODO_COUNTS_SCHEMA = '''
+    BEGIN IMMEDIATE;
+    CREATE TABLE IF NOT EXISTS todo_counts (
+        status VARCHAR(15) NOT NULL,
+        priority VARCHAR(10) NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (status, priority)
+    );
+    DELETE FROM todo_counts;
+    INSERT INTO todo_counts (status, priority, count)
+        SELECT IFNULL(status, ''), IFNULL(priority, ''), COUNT(*) FROM todos GROUP BY 1, 2;
+
+    CREATE TRIGGER IF NOT EXISTS todo_counts_insert
+        AFTER INSERT ON todos
+    BEGIN
+        INSERT INTO todo_counts (status, priority, count)
+            VALUES (IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''), 1)
+            ON CONFLICT (status, priority) DO UPDATE SET count = count + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS todo_counts_delete
+        AFTER DELETE ON todos
+    BEGIN
+        UPDATE todo_counts SET count = count - 1
+            WHERE status = IFNULL(OLD.status, '') AND priority = IFNULL(OLD.priority, '');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS todo_counts_update
+        AFTER UPDATE OF status, priority ON todos
+        FOR EACH ROW
+        WHEN OLD.status IS NOT NEW.status OR OLD.priority IS NOT NEW.priority
+    BEGIN
+        UPDATE todo_counts SET count = count - 1
+            WHERE status = IFNULL(OLD.status, '') AND priority = IFNULL(OLD.priority, '');
+        INSERT INTO todo_counts (status, priority, count)
+            VALUES (IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''), 1)
+            ON CONFLICT (status, priority) DO UPDATE SET count = count + 1;
+    END;
+    COMMIT;
+'''
+
+# テーブルごとの変更回数をトリガーで維持する表（ETag 用。更新日時は秒単位のため同じ秒の変更を区別できない）
+DATA_REVISIONS_SCHEMA = '''
+    BEGIN IMMEDIATE;
+    CREATE TABLE IF NOT EXISTS data_revisions (
+        name VARCHAR(20) PRIMARY KEY,
+        revision INTEGER NOT NULL DEFAULT 0
+    );
+    INSERT OR IGNORE INTO data_revisions (name) VALUES ('todos'), ('categories');
+
+    CREATE TRIGGER IF NOT EXISTS todos_revision_insert
+        AFTER INSERT ON todos
+    BEGIN
+        UPDATE data_revisions SET revision = revision + 1 WHERE name = 'todos';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS todos_revision_update
+        AFTER UPDATE ON todos
+    BEGIN
+        UPDATE data_revisions SET revision = revision + 1 WHERE name = 'todos';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS todos_revision_delete
+        AFTER DELETE ON todos
+    BEGIN
+        UPDATE data_revisions SET revision = revision + 1 WHERE name = 'todos';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS categories_revision_insert
+        AFTER INSERT ON categories
+    BEGIN
+        UPDATE data_revisions SET revision = revision + 1 WHERE name = 'categories';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS categories_revision_update
+        AFTER UPDATE ON categories
+    BEGIN
+        UPDATE data_revisions SET revision = revision + 1 WHERE name = 'categories';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS categories_revision_delete
+        AFTER DELETE ON categories
+    BEGIN
+        UPDATE data_revisions SET revision = revision + 1 WHERE name = 'categories';
+    END;
+    COMMIT;
+'''
+
+# タイトル・説明の部分一致検索用の全文検索テーブル（trigram トークナイザー、SQLite 3.34 以降）
+# todos を外部コンテンツとし、トリガーで索引を維持する
+TODO_SEARCH_SCHEMA = '''
+    BEGIN IMMEDIATE;
+    CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id', tokenize='trigram'
+    );
+    INSERT INTO todos_fts(todos_fts) VALUES ('rebuild');
+
+    CREATE TRIGGER IF NOT EXISTS todos_fts_insert
+        AFTER INSERT ON todos
+    BEGIN
+        INSERT INTO todos_fts(rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS todos_fts_delete
+        AFTER DELETE ON todos
+    BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+            VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS todos_fts_update
+        AFTER UPDATE OF title, description ON todos
+    BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+            VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO todos_fts(rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+    END;
+    COMMIT;
+'''
+
+# INSERT ... RETURNING が使えるか（SQLite 3.35 以降）
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 再利用のために保持する接続数の既定値（接続ごとのステートメントキャッシュをリクエスト間で使い回す）
+CONNECTION_POOL_SIZE = 8
+
+# スキーマSQLは import 時に一度だけ読み込む（ファイルがない場合は None）
+_SCHEMA_PATH = Path(__file__).parent / 'database_schema.sql'
+_SCHEMA_SQL = _SCHEMA_PATH.read_text(encoding='utf-8') if _SCHEMA_PATH.exists() else None
+
+
+@lru_cache(maxsize=64)
+def _row_type(columns: tuple):
+    """列名の組み合わせごとに行用のnamedtupleを作成（同じ列構成では再利用）"""
+    return namedtuple('Row', columns, rename=True)
+
+
+def _named_cursor(conn: sqlite3.Connection, query: str, params: tuple) -> sqlite3.Cursor:
+    """結果をnamedtupleで返すカーソルを作成"""
+    cursor = conn.cursor()
+    # sqlite3.Row を経由せず、素のタプルから直接namedtupleを組み立てる
+    cursor.row_factory = None
+    cursor.execute(query, params)
+    row_type = _row_type(tuple(column[0] for column in cursor.description))
+    cursor.row_factory = lambda _cursor, values: row_type._make(values)
+    return cursor
 
 
 class DatabaseManager:
@@ -14,25 +194,67 @@ class DatabaseManager:
     
     def __init__(self, db_path: str = 'todo_app.db'):
         self.db_path = db_path
-        self._init_database()
+        # スキーマ確認は最初の接続時に一度だけ行う
+        self._schema_ready = False
+        # 全文検索テーブルを使えるか（FTS5・trigram 非対応の SQLite では LIKE で検索）
+        self.has_search_index = False
+        # 返却された接続のプール
+        self._pool = []
+        self._pool_size = CONNECTION_POOL_SIZE
+        self._pool_lock = threading.Lock()
     
-    def _init_database(self):
-        """データベースの初期化"""
-        if not os.path.exists(self.db_path):
-            self._create_tables()
+    def initialize(self, db_path: Optional[str] = None, pool_size: Optional[int] = None):
+        """接続先を設定し、スキーマを確認・作成"""
+        if db_path is not None:
+            self.db_path = db_path
+        if pool_size is not None:
+            self._pool_size = pool_size
+        self._schema_ready = False
+        self.close_pool()
+        conn = self._connect()
+        try:
+            for pragma in DATABASE_PRAGMAS:
+                conn.execute(pragma)
+            # 統計情報が古い・未作成のテーブルのみ ANALYZE し、追加したインデックスを選ばせる
+            conn.execute('PRAGMA optimize')
+        finally:
+            conn.close()
     
-    def _create_tables(self):
+    def _init_database(self, conn: sqlite3.Connection):
+        """データベースの初期化（テーブルが未作成の場合のみ）"""
+        if not self._table_exists(conn, 'todos'):
+            self._create_tables(conn)
+        for statement in LIST_ORDER_INDEXES:
+            conn.execute(statement)
+        # 集計テーブルは既存データから件数を作成してからトリガーで維持する
+        if not self._table_exists(conn, 'todo_counts'):
+            conn.executescript(TODO_COUNTS_SCHEMA)
+        if not self._table_exists(conn, 'data_revisions'):
+            conn.executescript(DATA_REVISIONS_SCHEMA)
+        if not self._table_exists(conn, 'todos_fts'):
+            try:
+                conn.executescript(TODO_SEARCH_SCHEMA)
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.rollback()
+        self.has_search_index = self._table_exists(conn, 'todos_fts')
+        self._schema_ready = True
+    
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+        """テーブルが存在するか"""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+    
+    def _create_tables(self, conn: sqlite3.Connection):
         """テーブル作成とサンプルデータ投入"""
-        with self.get_connection() as conn:
-            # スキーマファイルを読み込んで実行
-            schema_path = os.path.join(os.path.dirname(__file__), 'database_schema.sql')
-            if os.path.exists(schema_path):
-                with open(schema_path, 'r', encoding='utf-8') as f:
-                    schema_sql = f.read()
-                conn.executescript(schema_sql)
-            else:
-                # スキーマファイルがない場合のフォールバック
-                self._create_tables_fallback(conn)
+        # 読み込み済みのスキーマを実行
+        if _SCHEMA_SQL is not None:
+            conn.executescript(_SCHEMA_SQL)
+        else:
+            # スキーマファイルがない場合のフォールバック
+            self._create_tables_fallback(conn)
     
     def _create_tables_fallback(self, conn: sqlite3.Connection):
         """スキーマファイルがない場合のテーブル作成"""
@@ -103,33 +325,124 @@ class DatabaseManager:
                 ('健康', '#dc3545', '健康・運動関連');
         ''')
     
+    def _connect(self) -> sqlite3.Connection:
+        """新しいデータベース接続を作成"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # 辞書形式でアクセス可能
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        # :memory: は接続ごとに別のデータベースになるため毎回スキーマを作成
+        if not self._schema_ready or self.db_path == ':memory:':
+            self._init_database(conn)
+        return conn
+    
+    def acquire_connection(self) -> sqlite3.Connection:
+        """プールから接続を取得（空なら新規作成）"""
+        with self._pool_lock:
+            if self._pool:
+                return self._pool.pop()
+        return self._connect()
+    
+    def release_connection(self, conn: sqlite3.Connection):
+        """接続をプールに返却（満杯の場合は閉じる）"""
+        if conn.in_transaction:
+            conn.rollback()
+        # :memory: は接続ごとに別のデータベースになるため再利用しない
+        if self.db_path != ':memory:':
+            with self._pool_lock:
+                if len(self._pool) < self._pool_size:
+                    self._pool.append(conn)
+                    return
+        conn.close()
+    
+    def close_pool(self):
+        """プール中の接続をすべて閉じる"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
+            conn.close()
+    
+    def get_request_connection(self) -> sqlite3.Connection:
+        """リクエスト中で共有する接続を取得（初回のみプールから取得）"""
+        conn = g.get('_database')
+        if conn is None:
+            conn = g._database = self.acquire_connection()
+        return conn
+    
     @contextmanager
     def get_connection(self):
         """データベース接続のコンテキストマネージャー"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # 辞書形式でアクセス可能
+        # アプリケーションコンテキスト内ではリクエスト単位の接続を再利用
+        if has_app_context():
+            yield self.get_request_connection()
+            return
+        
+        conn = self.acquire_connection()
         try:
             yield conn
         finally:
-            conn.close()
+            self.release_connection(conn)
     
     def execute_query(self, query: str, params: tuple = ()) -> list:
         """SELECT文実行"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+            return conn.execute(query, params).fetchall()
     
-    def execute_update(self, query: str, params: tuple = ()) -> int:
-        """INSERT/UPDATE/DELETE文実行"""
+    def iter_query(self, query: str, params: tuple = ()):
+        """SELECT文を実行し、結果を1行ずつ返す"""
+        with self.get_connection() as conn:
+            # yield from だと途中終了時にカーソルの close() が呼ばれ、閉じた接続で失敗するため for で回す
+            for row in conn.execute(query, params):
+                yield row
+    
+    def execute_named_query(self, query: str, params: tuple = ()) -> list:
+        """SELECT文実行（各行を属性アクセス可能なnamedtupleで返す）"""
+        with self.get_connection() as conn:
+            return _named_cursor(conn, query, params).fetchall()
+    
+    def iter_named_query(self, query: str, params: tuple = ()):
+        """SELECT文を実行し、namedtupleの行を1行ずつ返す"""
+        with self.get_connection() as conn:
+            for row in _named_cursor(conn, query, params):
+                yield row
+    
+    def execute_returning(self, query: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """RETURNING 句付きの INSERT/UPDATE 文を実行し、返された行を取得"""
+        with self.get_connection() as conn:
+            try:
+                # コミット前に結果行を読み切る
+                row = conn.execute(query, params).fetchone()
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            return row
+    
+    def _execute_write(self, query: str, params: tuple) -> sqlite3.Cursor:
+        """更新系SQLを実行してコミット"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid or cursor.rowcount
+            try:
+                cursor = conn.execute(query, params)
+                conn.commit()
+            except sqlite3.Error:
+                # 共有接続に未完了のトランザクションを残さない
+                conn.rollback()
+                raise
+            return cursor
+    
+    def execute_insert(self, query: str, params: tuple = ()) -> int:
+        """INSERT文実行（採番されたIDを返す）"""
+        return self._execute_write(query, params).lastrowid
+    
+    def execute_update(self, query: str, params: tuple = ()) -> int:
+        """UPDATE/DELETE文実行（影響を受けた行数を返す）"""
+        # 再利用する接続の lastrowid は直前の INSERT の値が残るため、行数のみを返す
+        return self._execute_write(query, params).rowcount
 
 
 # グローバルデータベースマネージャーインスタンス
+# （import 時には接続せず、init_database() で接続先を設定する）
 db_manager = DatabaseManager()
 
 
@@ -138,8 +451,20 @@ def get_db_connection():
     return db_manager.get_connection()
 
 
-def init_database(db_path: str = 'todo_app.db'):
+def get_db() -> sqlite3.Connection:
+    """現在のリクエストで共有するデータベース接続を取得"""
+    return db_manager.get_request_connection()
+
+
+def close_db(exception: Optional[BaseException] = None):
+    """リクエスト終了時に共有接続をプールに返却"""
+    conn = g.pop('_database', None)
+    if conn is not None:
+        db_manager.release_connection(conn)
+
+
+def init_database(db_path: str = 'todo_app.db', pool_size: Optional[int] = None):
     """データベースを初期化"""
-    global db_manager
-    db_manager = DatabaseManager(db_path)
+    # モデルが import 済みのインスタンスを参照し続けるよう、差し替えずに再設定する
+    db_manager.initialize(db_path, pool_size)
     return db_manager
\ No newline at end of file
@@ -50,6 +50,14 @@ CREATE INDEX idx_todos_status_priority ON todos(status, priority);
 CREATE INDEX idx_todos_category_status ON todos(category_id, status);
 CREATE INDEX idx_todos_due_date_status ON todos(due_date, status);
 
+-- 一覧の並び順（display_order, created_at DESC）用インデックス（ソートなしで LIMIT まで読み進められる）
+CREATE INDEX idx_todos_order ON todos(display_order, created_at DESC);
+CREATE INDEX idx_todos_status_order ON todos(status, display_order, created_at DESC);
+CREATE INDEX idx_todos_category_order ON todos(category_id, display_order, created_at DESC);
+
+-- ステータスで絞り込み、作成日時で並び替える一覧用インデックス
+CREATE INDEX idx_todos_status_created ON todos(status, created_at);
+
 -- ======================
 -- トリガー設計
 -- ======================
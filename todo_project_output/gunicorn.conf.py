@@ -0,0 +1,22 @@
+"""
+gunicorn 設定ファイル
+gevent ワーカーで I/O 待ちのリクエストを協調的に並行処理する
+"""
+
+import os
+
+# 待ち受けアドレス（Flask の設定と同じ環境変数を使用）
+bind = f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('FLASK_PORT', '5000')}"
+
+# ワーカー設定
+# カテゴリ・統計・描画結果のキャッシュはプロセスごとに保持され、無効化も同じプロセス内にしか届かない。
+# 複数ワーカーにすると他のワーカーの変更がTTL（最大60秒）の間反映されないため、既定は1プロセスとし
+# 並行処理は gevent のコネクションで行う
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# ログ設定
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
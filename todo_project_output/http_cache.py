@@ -0,0 +1,70 @@
+"""
+HTTPキャッシュモジュール
+ETagによる条件付きGETで、未変更のレスポンスを 304 で返す
+"""
+
+import hashlib
+import sqlite3
+from functools import wraps
+from typing import Callable, Optional
+from flask import Response, make_response, request, session
+from cache import cache
+
+# 描画結果を保持する秒数（ETag が変わった場合はその時点で描画し直す）
+PAGE_CACHE_TTL = 60
+
+
+def make_etag(*parts) -> str:
+    """変更検知用の値からETagを生成"""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def not_modified(etag: str) -> Optional[Response]:
+    """クライアントのキャッシュが有効なら 304 レスポンスを返す"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def etag_page(get_parts: Callable[[], tuple], cache_page: bool = False) -> Callable:
+    """ページの変更検知用の値からETagを付け、未変更ならDB参照と描画を行わず 304 を返すデコレーター"""
+    # cache_page: クエリ引数のないページの描画結果をETagとともにプロセス内で保持し、全利用者に再利用する。
+    #   保持するのは一括で描画した 200 のレスポンスのみ（ストリーミングのレスポンスは保持しない）。
+    #   セッション固有の内容はフラッシュメッセージのみを想定し、未表示のメッセージがある
+    #   リクエストでは保持・再利用を行わない。それ以外のセッション依存の内容をページに含めないこと
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # 未表示のフラッシュメッセージがある場合は通常どおり描画する
+            if session.get('_flashes'):
+                return func(*args, **kwargs)
+            try:
+                etag = make_etag(*get_parts())
+            except sqlite3.Error:
+                # エラー表示はルート側に任せる
+                return func(*args, **kwargs)
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+            
+            # 引数ごとに保持すると組み合わせの数だけ増えるため、既定の表示のみ対象にする
+            page_key = ('pages', request.path) if cache_page and not request.args else None
+            if page_key is not None:
+                found, entry = cache.get(page_key)
+                if found and entry[0] == etag:
+                    response = Response(entry[1], mimetype=entry[2])
+                    response.set_etag(etag)
+                    return response
+            
+            response = make_response(func(*args, **kwargs))
+            # 描画中にエラーを通知した場合はキャッシュさせない
+            # ストリーミングのレスポンスは送信途中で失敗し得るため、ETagを付けず保持もしない
+            if not session.get('_flashes') and not response.is_streamed:
+                response.set_etag(etag)
+                if page_key is not None and response.status_code == 200:
+                    cache.set(page_key, (etag, response.get_data(), response.mimetype), PAGE_CACHE_TTL)
+            return response
+        return wrapper
+    return decorator
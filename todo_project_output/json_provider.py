@@ -0,0 +1,73 @@
+"""
+JSONシリアライズ設定モジュール
+orjson が利用可能な場合は Flask の JSON プロバイダーを高速な実装に置き換える
+"""
+
+import json
+from datetime import date
+from typing import Any, Iterable
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """orjson が直接扱えない型の変換"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _iso_default(obj: Any) -> Any:
+    """標準 json で日付を orjson と同じ ISO 8601 形式に変換"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class IsoDateJSONProvider(DefaultJSONProvider):
+    """orjson がない場合のプロバイダー（日付の出力形式を orjson と揃える）"""
+
+    default = staticmethod(_iso_default)
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson ベースの JSON プロバイダー"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """JSON文字列に変換（デバッグ時のみ整形出力）"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """JSON文字列を読み込み（セッションの object_hook などの指定時は標準 json を使用）"""
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def list_response(items: Iterable[dict], pagination: dict) -> Response:
+    """一覧APIのレスポンスを作成（各要素を直接JSONに変換して連結し、外側の辞書・リストを組み立てない）"""
+    # 送信開始前に全要素を変換する（変換できない要素は途中で切れた 200 ではなく、通常のエラーレスポンスになる）
+    dumps = current_app.json.dumps
+    data = [dumps(item) for item in items]
+    body = (f'{{"success": true, "data": [{",".join(data)}], "count": {len(data)}, '
+            f'"pagination": {dumps(pagination)}}}')
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def init_json_provider(app: Flask):
+    """JSON プロバイダーを設定（orjson が利用可能なら高速な実装を使用）"""
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = IsoDateJSONProvider(app)
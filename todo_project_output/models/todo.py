@@ -4,13 +4,270 @@ Todoモデル定義
 """
 
 from datetime import datetime, date
-from typing import List, Optional, Dict, Any
-from database import db_manager
+from functools import lru_cache
+from itertools import chain
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from database import db_manager, SUPPORTS_RETURNING
+from cache import cache, memoize
+
+# 集計・一覧のキャッシュ有効期限（秒）。書き込み時には即時に無効化する
+STATS_CACHE_TTL = 30
+CATEGORIES_CACHE_TTL = 60
+
+# 優先度・ステータスの選択肢
+PRIORITIES = frozenset(('low', 'medium', 'high'))
+STATUSES = frozenset(('pending', 'in_progress', 'completed'))
+
+# ステータス -> 統計情報のキー
+STATUS_STAT_KEYS = {
+    'completed': 'completed_tasks',
+    'pending': 'pending_tasks',
+    'in_progress': 'in_progress_tasks'
+}
+
+# APIの部分更新で受け付けるカラム
+UPDATABLE_FIELDS = ('title', 'description', 'category_id', 'priority', 'status', 'due_date')
+# 部分更新（update_fields・bulk_update）で変更可能なカラム（並び順はAPIの許可リストに含めない）
+TODO_UPDATE_COLUMNS = UPDATABLE_FIELDS + ('display_order',)
+
+
+# カテゴリ取得用のカラム（Category.from_row の位置と対応）
+CATEGORY_COLUMNS = 'id, name, color, description, created_at, updated_at'
+
+# カテゴリを結合したTodo取得用のカラム（埋め込みカテゴリに必要な項目を1クエリで取得）
+TODO_WITH_CATEGORY_COLUMNS = (
+    't.*, c.name as category_name, c.color as category_color, '
+    'c.description as category_description, c.created_at as category_created_at, '
+    'c.updated_at as category_updated_at'
+)
+
+_SELECT_TODO_BY_ID = f'''
+    SELECT {TODO_WITH_CATEGORY_COLUMNS}
+    FROM todos t
+    LEFT JOIN categories c ON t.category_id = c.id
+    WHERE t.id = ?
+'''
+
+
+# 完了・未完了を切り替えるSQL（SET の右辺はすべて更新前の値で評価される）
+_TOGGLE_TODO = '''
+    UPDATE todos
+    SET status = CASE WHEN status = 'completed' THEN 'pending' ELSE 'completed' END,
+        completed_at = CASE WHEN status = 'completed' THEN NULL ELSE ? END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?'''
+
+
+def _insert_returning(query: str, params: tuple, table: str):
+    """INSERTを実行し、採番されたIDとタイムスタンプの行を返す"""
+    if SUPPORTS_RETURNING:
+        return db_manager.execute_returning(f'{query} RETURNING id, created_at, updated_at', params)
+    row_id = db_manager.execute_insert(query, params)
+    return db_manager.execute_query(f'SELECT id, created_at, updated_at FROM {table} WHERE id = ?', (row_id,))[0]
+
+
+# 全文検索テーブルで検索する検索語の最小文字数（trigram トークナイザーの単位）
+FTS_MIN_SEARCH_LENGTH = 3
+
+# 一覧の既定の並び順（id で同順位をなくし、ページ間で行が重複・欠落しないようにする）
+# id は昇順にし、インデックス末尾の rowid の順序のまま並べ替えなしで読めるようにする
+DEFAULT_TODO_ORDER = 't.display_order, t.created_at DESC, t.id'
+
+# 優先度・ステータスの並び順（未知の値は 0）
+PRIORITY_RANK = {'high': 3, 'medium': 2, 'low': 1}
+STATUS_RANK = {'pending': 1, 'in_progress': 2, 'completed': 3}
+
+
+def _rank_expression(column: str, ranks: Dict[str, int]) -> str:
+    """値を順位の整数に変換するCASE式"""
+    branches = ' '.join(f"WHEN '{value}' THEN {rank}" for value, rank in ranks.items())
+    return f'CASE {column} {branches} ELSE 0 END'
+
+
+# 並び替え可能な項目（sort パラメータのホワイトリスト）とORDER BY の式
+TODO_SORT_EXPRESSIONS = {
+    'title': ('LOWER(t.title)',),
+    'priority': (_rank_expression('t.priority', PRIORITY_RANK),),
+    # 期限なしは昇順で末尾
+    'due_date': ("IFNULL(t.due_date, '') = ''", 't.due_date'),
+    'status': (_rank_expression('t.status', STATUS_RANK),),
+    'created_at': ('t.created_at',),
+}
+
+
+@lru_cache(maxsize=None)
+def _build_where(has_status: bool, has_category: bool, has_priority: bool,
+                 search_mode: Optional[str] = None) -> str:
+    """指定された絞り込み条件の組み合わせに対応するWHERE句"""
+    conditions = 'WHERE 1=1'
+    if has_status:
+        conditions += ' AND t.status = ?'
+    if has_category:
+        conditions += ' AND t.category_id = ?'
+    if has_priority:
+        conditions += ' AND t.priority = ?'
+    if search_mode == 'fts':
+        conditions += ' AND t.id IN (SELECT rowid FROM todos_fts WHERE todos_fts MATCH ?)'
+    elif search_mode == 'like':
+        conditions += " AND (t.title LIKE ? ESCAPE '\\' OR t.description LIKE ? ESCAPE '\\')"
+    return conditions
+
+
+@lru_cache(maxsize=None)
+def _build_order(sort_by: Optional[str], descending: bool) -> str:
+    """並び順のORDER BY 句（sort_by 未指定時は既定の並び順）"""
+    if sort_by is None:
+        return f'ORDER BY {DEFAULT_TODO_ORDER}'
+    direction = ' DESC' if descending else ''
+    expressions = TODO_SORT_EXPRESSIONS.get(sort_by, TODO_SORT_EXPRESSIONS['created_at'])
+    # 同順位は既定の並び順
+    return f"ORDER BY {', '.join(expr + direction for expr in expressions)}, {DEFAULT_TODO_ORDER}"
+
+
+@lru_cache(maxsize=None)
+def _build_select(has_status: bool, has_category: bool, has_priority: bool, has_limit: bool,
+                  with_total: bool = False, search_mode: Optional[str] = None,
+                  sort_by: Optional[str] = None, descending: bool = False) -> str:
+    """Todo一覧取得SQL（条件の組み合わせごとに一度だけ組み立て、同一文字列を再利用）"""
+    # with_total: ウィンドウ関数で条件に一致する総件数を各行に付与
+    total_column = ', COUNT(*) OVER () AS total_count' if with_total else ''
+    query = f'''
+            SELECT {TODO_WITH_CATEGORY_COLUMNS}{total_column}
+            FROM todos t
+            LEFT JOIN categories c ON t.category_id = c.id
+            {_build_where(has_status, has_category, has_priority, search_mode)}
+            {_build_order(sort_by, descending)}'''
+    if has_limit:
+        query += ' LIMIT ? OFFSET ?'
+    return query
+
+
+@lru_cache(maxsize=None)
+def _build_due_select(operator: str) -> str:
+    """未完了で期限が指定日と比較条件に一致するTodoの取得SQL"""
+    return f'''
+            SELECT {TODO_WITH_CATEGORY_COLUMNS}
+            FROM todos t
+            LEFT JOIN categories c ON t.category_id = c.id
+            WHERE t.due_date {operator} ? AND t.status != 'completed'
+            ORDER BY {DEFAULT_TODO_ORDER}'''
+
+
+# メインページの3つの一覧（0: 最近, 1: 期限切れ, 2: 今日期限）を1回で取得するSQL
+# 複合SELECTの各部分は section で区別し、全体の ORDER BY で各一覧内の並び順を保つ
+_SELECT_DASHBOARD_TODOS = f'''
+    SELECT * FROM (
+        SELECT 0 AS section, {TODO_WITH_CATEGORY_COLUMNS}
+        FROM todos t
+        LEFT JOIN categories c ON t.category_id = c.id
+        ORDER BY {DEFAULT_TODO_ORDER}
+        LIMIT ?
+    )
+    UNION ALL
+    SELECT 1, {TODO_WITH_CATEGORY_COLUMNS}
+    FROM todos t
+    LEFT JOIN categories c ON t.category_id = c.id
+    WHERE t.due_date < ? AND t.status != 'completed'
+    UNION ALL
+    SELECT 2, {TODO_WITH_CATEGORY_COLUMNS}
+    FROM todos t
+    LEFT JOIN categories c ON t.category_id = c.id
+    WHERE t.due_date = ? AND t.status != 'completed'
+    ORDER BY section, display_order, created_at DESC, id
+'''
+
+
+def _search_mode(search: Optional[str]) -> Optional[str]:
+    """検索方法（'fts': 全文検索テーブル、'like': LIKE による部分一致、None: 検索なし）"""
+    if not search:
+        return None
+    # trigram の索引は3文字未満の検索語には使えない
+    if db_manager.has_search_index and len(search) >= FTS_MIN_SEARCH_LENGTH:
+        return 'fts'
+    return 'like'
+
+
+def _search_params(search: str, search_mode: str) -> tuple:
+    """検索方法に対応する _build_where のパラメータ"""
+    if search_mode == 'fts':
+        # 検索語全体を1つのフレーズとして部分一致させる
+        return ('"{}"'.format(search.replace('"', '""')),)
+    # LIKE のワイルドカード文字はエスケープ
+    escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = f'%{escaped}%'
+    return (pattern, pattern)
+
+
+# トリガーで維持しているテーブルの変更回数を取得するSQL
+_SELECT_REVISION = "SELECT revision FROM data_revisions WHERE name = '{}'"
+_CATEGORY_FINGERPRINT = f"SELECT ({_SELECT_REVISION.format('categories')}), COUNT(*) FROM categories"
+
+
+@lru_cache(maxsize=None)
+def _build_fingerprint(has_status: bool, has_category: bool, has_priority: bool) -> str:
+    """Todo一覧の変更検知用SQL（変更回数と件数）"""
+    where = _build_where(has_status, has_category, has_priority)
+    return f"SELECT ({_SELECT_REVISION.format('todos')}), COUNT(*) FROM todos t {where}"
+
+
+@lru_cache(maxsize=128)
+def _build_update(fields: tuple, id_count: int = 1) -> str:
+    """指定カラムのみを更新するSQL（カラムの組み合わせと対象件数ごとにキャッシュ）"""
+    assignments = ', '.join(f'{field} = ?' for field in fields)
+    return f'UPDATE todos SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE {_id_condition(id_count)}'
+
+
+def _id_condition(id_count: int) -> str:
+    """ID指定の条件（複数件は IN 句）"""
+    if id_count == 1:
+        return 'id = ?'
+    return f"id IN ({', '.join('?' * id_count)})"
+
+
+@lru_cache(maxsize=None)
+def _build_count(has_status: bool, has_category: bool, has_priority: bool,
+                 search_mode: Optional[str] = None) -> str:
+    """Todo件数取得SQL"""
+    return f'SELECT COUNT(*) FROM todos t {_build_where(has_status, has_category, has_priority, search_mode)}'
+
+
+@lru_cache(maxsize=1024)
+def _parse_due_date(value) -> Optional[date]:
+    """期限日をdateに変換（date は不変のため同じ値の変換結果を共有）"""
+    # 変換済み・未設定の値を先に判定（type() 比較は isinstance の MRO 探索を行わない）
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, str):
+        return date.fromisoformat(value) if value else None
+    return value
+
+
+def parse_iso_date(value) -> Optional[date]:
+    """入力された YYYY-MM-DD 形式の日付を変換（形式が正しくない場合は None）"""
+    # Python 3.11 以降の fromisoformat が受け付ける他のISO形式は入力として認めない
+    if not isinstance(value, str) or len(value) != 10 or value[4] != '-' or value[7] != '-':
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """日時文字列をdatetimeに変換"""
+    if value is None or type(value) is datetime:
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value) if value else None
+    return value
 
 
 class Category:
     """カテゴリモデル"""
     
+    # インスタンスごとの __dict__ を持たず、メモリ使用量と属性アクセスを削減
+    __slots__ = ('id', 'name', 'color', 'description', 'created_at', 'updated_at')
+    
     def __init__(self, id: int = None, name: str = None, color: str = '#6c757d', 
                  description: str = None, created_at: datetime = None, 
                  updated_at: datetime = None):
@@ -33,15 +290,28 @@ class Category:
             updated_at=data.get('updated_at')
         )
     
+    @classmethod
+    def from_row(cls, row) -> 'Category':
+        """CATEGORY_COLUMNS 順の行からCategoryインスタンスを作成（dict を経由しない）"""
+        category_id, name, color, description, created_at, updated_at = row
+        return cls(
+            id=category_id,
+            name=name,
+            color=color,
+            description=description,
+            created_at=created_at,
+            updated_at=updated_at
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
-        """辞書形式に変換"""
+        """辞書形式に変換（日付は JSON プロバイダーが ISO 8601 形式で出力する）"""
         return {
             'id': self.id,
             'name': self.name,
             'color': self.color,
             'description': self.description,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     def save(self) -> int:
@@ -54,6 +324,7 @@ class Category:
                 WHERE id = ?
             '''
             db_manager.execute_update(query, (self.name, self.color, self.description, self.id))
+            cache.invalidate('categories')
             return self.id
         else:
             # 新規作成
@@ -61,7 +332,10 @@ class Category:
                 INSERT INTO categories (name, color, description)
                 VALUES (?, ?, ?)
             '''
-            self.id = db_manager.execute_update(query, (self.name, self.color, self.description))
+            # 採番IDとタイムスタンプを同じ文で受け取り、再取得のクエリを省く
+            row = _insert_returning(query, (self.name, self.color, self.description), 'categories')
+            self.id, self.created_at, self.updated_at = row['id'], row['created_at'], row['updated_at']
+            cache.invalidate('categories')
             return self.id
     
     def delete(self) -> bool:
@@ -69,35 +343,72 @@ class Category:
         if self.id:
             query = 'DELETE FROM categories WHERE id = ?'
             result = db_manager.execute_update(query, (self.id,))
+            cache.invalidate('categories')
             return result > 0
         return False
     
     @staticmethod
+    @memoize('categories', ttl=CATEGORIES_CACHE_TTL)
     def get_all() -> List['Category']:
         """全カテゴリを取得"""
-        query = '''
-            SELECT id, name, color, description, created_at, updated_at
+        query = f'''
+            SELECT {CATEGORY_COLUMNS}
             FROM categories
             ORDER BY name
         '''
         rows = db_manager.execute_query(query)
-        return [Category.from_dict(dict(row)) for row in rows]
+        return [Category.from_row(row) for row in rows]
+    
+    @staticmethod
+    @memoize('categories', ttl=CATEGORIES_CACHE_TTL)
+    def get_map() -> Dict[int, 'Category']:
+        """全カテゴリのマップを取得（ID -> Category）"""
+        return {category.id: category for category in Category.get_all()}
+    
+    @staticmethod
+    def get_cached(category_id: int) -> Optional['Category']:
+        """キャッシュ済みの全カテゴリからIDで取得（クエリを発行しない）"""
+        return Category.get_map().get(category_id)
     
     @staticmethod
     def get_by_id(category_id: int) -> Optional['Category']:
         """IDでカテゴリを取得"""
-        query = '''
-            SELECT id, name, color, description, created_at, updated_at
+        query = f'''
+            SELECT {CATEGORY_COLUMNS}
             FROM categories
             WHERE id = ?
         '''
         rows = db_manager.execute_query(query, (category_id,))
-        return Category.from_dict(dict(rows[0])) if rows else None
+        return Category.from_row(rows[0]) if rows else None
+    
+    @staticmethod
+    def get_by_ids(category_ids) -> Dict[int, 'Category']:
+        """複数IDのカテゴリを1回のクエリで取得（ID -> Category）"""
+        category_ids = list(category_ids)
+        if not category_ids:
+            return {}
+        placeholders = ', '.join('?' * len(category_ids))
+        query = f'''
+            SELECT {CATEGORY_COLUMNS}
+            FROM categories
+            WHERE id IN ({placeholders})
+        '''
+        rows = db_manager.execute_query(query, tuple(category_ids))
+        return {row[0]: Category.from_row(row) for row in rows}
+    
+    @staticmethod
+    def fingerprint() -> tuple:
+        """カテゴリ一覧の変更検知用の値（変更回数, 件数）"""
+        row = db_manager.execute_query(_CATEGORY_FINGERPRINT)[0]
+        return tuple(row)
 
 
 class Todo:
     """Todoモデル"""
     
+    __slots__ = ('id', 'title', 'description', 'category_id', 'priority', 'status', 'due_date',
+                 'completed_at', 'created_at', 'updated_at', 'display_order', '_category')
+    
     def __init__(self, id: int = None, title: str = None, description: str = None,
                  category_id: int = None, priority: str = 'medium', status: str = 'pending',
                  due_date: date = None, completed_at: datetime = None,
@@ -119,41 +430,46 @@ class Todo:
     @property
     def category(self) -> Optional[Category]:
         """関連するカテゴリを取得"""
+        # 一覧・詳細取得ではJOINで読み込み済み。ここでは個別クエリを発行しない（N+1防止）
+        return self._category
+    
+    def load_category(self) -> Optional[Category]:
+        """カテゴリが未読み込みの場合のみ取得（単一Todoの作成・更新後に明示的に使う）"""
         if self._category is None and self.category_id:
-            self._category = Category.get_by_id(self.category_id)
+            self._category = Category.get_cached(self.category_id)
         return self._category
     
+    def _drop_stale_category(self):
+        """category_id と一致しなくなった読み込み済みカテゴリを破棄"""
+        if self._category is not None and self._category.id != self.category_id:
+            self._category = None
+    
     @property
     def is_overdue(self) -> bool:
         """期限切れかどうか"""
-        if self.due_date and self.status != 'completed':
-            return self.due_date < date.today()
-        return False
+        return self.is_overdue_on()
     
     @property
     def is_due_today(self) -> bool:
         """今日が期限かどうか"""
+        return self.is_due_on()
+    
+    def is_overdue_on(self, today: date = None) -> bool:
+        """指定日（省略時は今日）時点で期限切れかどうか（一覧では today を一度だけ求めて渡す）"""
+        # 今日の日付は期限のある未完了のTodoでのみ取得
         if self.due_date and self.status != 'completed':
-            return self.due_date == date.today()
+            return self.due_date < (today or date.today())
+        return False
+    
+    def is_due_on(self, today: date = None) -> bool:
+        """指定日（省略時は今日）が期限かどうか"""
+        if self.due_date and self.status != 'completed':
+            return self.due_date == (today or date.today())
         return False
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Todo':
         """辞書からTodoインスタンスを作成"""
-        due_date = None
-        if data.get('due_date'):
-            if isinstance(data['due_date'], str):
-                due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
-            else:
-                due_date = data['due_date']
-        
-        completed_at = None
-        if data.get('completed_at'):
-            if isinstance(data['completed_at'], str):
-                completed_at = datetime.fromisoformat(data['completed_at'])
-            else:
-                completed_at = data['completed_at']
-        
         return cls(
             id=data.get('id'),
             title=data.get('title'),
@@ -161,15 +477,20 @@ class Todo:
             category_id=data.get('category_id'),
             priority=data.get('priority', 'medium'),
             status=data.get('status', 'pending'),
-            due_date=due_date,
-            completed_at=completed_at,
+            due_date=_parse_due_date(data.get('due_date')),
+            completed_at=_parse_datetime(data.get('completed_at')),
             created_at=data.get('created_at'),
             updated_at=data.get('updated_at'),
             display_order=data.get('display_order', 0)
         )
     
-    def to_dict(self, include_category: bool = False) -> Dict[str, Any]:
-        """辞書形式に変換"""
+    def to_dict(self, include_category: bool = False, today: date = None) -> Dict[str, Any]:
+        """辞書形式に変換（一覧では today を渡して行ごとの date.today() を省く）"""
+        # 期限判定の対象（完了済み・期限なしは None。その場合は今日の日付を取得しない）
+        open_due_date = self.due_date if self.status != 'completed' else None
+        if today is None and open_due_date is not None:
+            today = date.today()
+        # 日付は変換せずに渡し、JSON プロバイダーが ISO 8601 形式で出力する
         result = {
             'id': self.id,
             'title': self.title,
@@ -177,22 +498,50 @@ class Todo:
             'category_id': self.category_id,
             'priority': self.priority,
             'status': self.status,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'due_date': self.due_date,
+            'completed_at': self.completed_at,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'display_order': self.display_order,
-            'is_overdue': self.is_overdue,
-            'is_due_today': self.is_due_today
+            'is_overdue': open_due_date is not None and open_due_date < today,
+            'is_due_today': open_due_date is not None and open_due_date == today
         }
         
-        if include_category and self.category:
-            result['category'] = self.category.to_dict()
+        # 読み込み済みのカテゴリのみ使用（DBアクセスしない）
+        if include_category and self._category is not None:
+            result['category'] = self._category.to_dict()
         
         return result
     
+    def to_dict_with_category(self, category_map: Dict[int, Category], today: date = None) -> Dict[str, Any]:
+        """事前に取得したカテゴリマップを使って辞書形式に変換（個別クエリなし）"""
+        result = self.to_dict(today=today)
+        category = category_map.get(self.category_id)
+        if category:
+            result['category'] = category.to_dict()
+        return result
+    
+    @staticmethod
+    def build_category_map(todos: List['Todo']) -> Dict[int, Category]:
+        """Todo一覧が参照するカテゴリのマップを作成（未取得分のみ一括取得）"""
+        category_map = {}
+        missing_ids = set()
+        for todo in todos:
+            if not todo.category_id:
+                continue
+            if todo._category is not None:
+                category_map[todo.category_id] = todo._category
+            else:
+                missing_ids.add(todo.category_id)
+        
+        missing_ids.difference_update(category_map)
+        if missing_ids:
+            category_map.update(Category.get_by_ids(missing_ids))
+        return category_map
+    
     def save(self) -> int:
         """Todoを保存"""
+        self._drop_stale_category()
         if self.id:
             # 更新
             query = '''
@@ -205,6 +554,7 @@ class Todo:
                 self.title, self.description, self.category_id, self.priority,
                 self.status, self.due_date, self.display_order, self.id
             ))
+            cache.invalidate('stats')
             return self.id
         else:
             # 新規作成
@@ -212,20 +562,62 @@ class Todo:
                 INSERT INTO todos (title, description, category_id, priority, status, due_date, display_order)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             '''
-            self.id = db_manager.execute_update(query, (
+            # 採番IDとタイムスタンプを同じ文で受け取り、再取得のクエリを省く
+            row = _insert_returning(query, (
                 self.title, self.description, self.category_id, self.priority,
                 self.status, self.due_date, self.display_order
-            ))
+            ), 'todos')
+            self.id, self.created_at, self.updated_at = row['id'], row['created_at'], row['updated_at']
+            self.due_date = _parse_due_date(self.due_date)
+            cache.invalidate('stats')
             return self.id
     
+    def update_fields(self, updates: Dict[str, Any]) -> bool:
+        """指定された項目のみを1つのUPDATE文で更新"""
+        fields = tuple(field for field in TODO_UPDATE_COLUMNS if field in updates)
+        if not self.id or not fields:
+            return False
+        
+        values = tuple(updates[field] for field in fields)
+        for field, value in zip(fields, values):
+            setattr(self, field, value)
+        self._drop_stale_category()
+        db_manager.execute_update(_build_update(fields), values + (self.id,))
+        cache.invalidate('stats')
+        return True
+    
     def delete(self) -> bool:
         """Todoを削除"""
         if self.id:
             query = 'DELETE FROM todos WHERE id = ?'
             result = db_manager.execute_update(query, (self.id,))
+            cache.invalidate('stats')
             return result > 0
         return False
     
+    @staticmethod
+    def delete_by_id(todo_id: int) -> bool:
+        """IDを指定して1つのDELETE文で削除（存在しなかった場合は False）"""
+        result = db_manager.execute_update('DELETE FROM todos WHERE id = ?', (todo_id,))
+        if result:
+            cache.invalidate('stats')
+        return result > 0
+    
+    @staticmethod
+    def toggle(todo_id: int) -> Optional[str]:
+        """完了・未完了を1つのUPDATE文で切り替え、切り替え後のステータスを返す（存在しない場合は None）"""
+        params = (datetime.now().isoformat(sep=' '), todo_id)
+        if SUPPORTS_RETURNING:
+            row = db_manager.execute_returning(f'{_TOGGLE_TODO} RETURNING status', params)
+            status = row['status'] if row else None
+        elif db_manager.execute_update(_TOGGLE_TODO, params):
+            status = db_manager.execute_query('SELECT status FROM todos WHERE id = ?', (todo_id,))[0][0]
+        else:
+            status = None
+        if status is not None:
+            cache.invalidate('stats')
+        return status
+    
     def mark_completed(self) -> bool:
         """完了状態にマーク"""
         self.status = 'completed'
@@ -239,85 +631,245 @@ class Todo:
         return self.save() > 0
     
     @staticmethod
-    def get_all(status: str = None, category_id: int = None, priority: str = None) -> List['Todo']:
-        """Todo一覧を取得"""
-        query = '''
-            SELECT t.*, c.name as category_name, c.color as category_color
-            FROM todos t
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE 1=1
-        '''
-        params = []
-        
-        if status:
-            query += ' AND t.status = ?'
-            params.append(status)
-        
-        if category_id:
-            query += ' AND t.category_id = ?'
-            params.append(category_id)
-        
-        if priority:
-            query += ' AND t.priority = ?'
-            params.append(priority)
-        
-        query += ' ORDER BY t.display_order, t.created_at DESC'
-        
-        rows = db_manager.execute_query(query, tuple(params))
-        todos = []
-        for row in rows:
-            todo = Todo.from_dict(dict(row))
-            if row['category_name']:
-                todo._category = Category(
-                    id=row['category_id'],
-                    name=row['category_name'],
-                    color=row['category_color']
+    def _filter_params(status: str = None, category_id: int = None, priority: str = None,
+                       search: str = None) -> tuple:
+        """指定された絞り込み条件のパラメータを _build_where と同じ順序で取得"""
+        params = tuple(value for value in (status, category_id, priority) if value)
+        if search:
+            params += _search_params(search, _search_mode(search))
+        return params
+    
+    @staticmethod
+    def _build_list_query(status: str = None, category_id: int = None, priority: str = None,
+                          limit: int = None, offset: int = 0, search: str = None,
+                          sort_by: str = None, sort_order: str = 'asc', with_total: bool = False):
+        """一覧取得用のSQLとパラメータを組み立て"""
+        query = _build_select(bool(status), bool(category_id), bool(priority), limit is not None,
+                              with_total, _search_mode(search), sort_by, sort_order == 'desc')
+        params = Todo._filter_params(status, category_id, priority, search)
+        if limit is not None:
+            params += (limit, offset)
+        return query, params
+    
+    @staticmethod
+    def _fetch_list(query: str, params: tuple) -> List['Todo']:
+        """カテゴリを結合した一覧SQLを実行してTodoのリストを作成"""
+        rows = db_manager.execute_named_query(query, params)
+        categories = {}
+        return [Todo._from_joined_row(row, categories) for row in rows]
+    
+    @staticmethod
+    def _from_joined_row(row, categories: Dict[int, Category] = None) -> 'Todo':
+        """カテゴリを結合した行からTodoを作成（categories を渡すと同じカテゴリのインスタンスを共有）"""
+        # 行は execute_named_query のnamedtuple（dict 変換や列名での検索をしない）
+        todo = Todo(
+            id=row.id,
+            title=row.title,
+            description=row.description,
+            category_id=row.category_id,
+            priority=row.priority,
+            status=row.status,
+            due_date=_parse_due_date(row.due_date),
+            completed_at=_parse_datetime(row.completed_at),
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            display_order=row.display_order
+        )
+        if row.category_name:
+            category = categories.get(row.category_id) if categories is not None else None
+            if category is None:
+                category = Category(
+                    id=row.category_id,
+                    name=row.category_name,
+                    color=row.category_color,
+                    description=row.category_description,
+                    created_at=row.category_created_at,
+                    updated_at=row.category_updated_at
                 )
-            todos.append(todo)
-        
-        return todos
+                if categories is not None:
+                    categories[row.category_id] = category
+            todo._category = category
+        return todo
+    
+    @staticmethod
+    def get_all(status: str = None, category_id: int = None, priority: str = None,
+                limit: int = None, offset: int = 0, search: str = None,
+                sort_by: str = None, sort_order: str = 'asc') -> List['Todo']:
+        """Todo一覧を取得（検索・並び替え・limit 指定時のページングはSQL側で実行）"""
+        query, params = Todo._build_list_query(status, category_id, priority, limit, offset,
+                                               search, sort_by, sort_order)
+        return Todo._fetch_list(query, params)
+    
+    @staticmethod
+    def get_page(status: str = None, category_id: int = None, priority: str = None,
+                 limit: int = 20, offset: int = 0, search: str = None,
+                 sort_by: str = None, sort_order: str = 'asc') -> Tuple[List['Todo'], int]:
+        """1ページ分のTodoと総件数を1回のクエリで取得"""
+        query, params = Todo._build_list_query(status, category_id, priority, limit, offset,
+                                               search, sort_by, sort_order, with_total=True)
+        rows = db_manager.execute_named_query(query, params)
+        if not rows:
+            # 範囲外のページでは行がなく総件数も得られないため個別に数える
+            return [], Todo.count(status, category_id, priority, search) if offset else 0
+        categories = {}
+        return [Todo._from_joined_row(row, categories) for row in rows], rows[0].total_count
+    
+    @staticmethod
+    def iter_page(status: str = None, category_id: int = None, priority: str = None,
+                  limit: int = 20, offset: int = 0, search: str = None,
+                  sort_by: str = None, sort_order: str = 'asc') -> Tuple[Iterator['Todo'], int]:
+        """1ページ分のTodoをカーソルから1件ずつ返すイテレーターと総件数を取得"""
+        query, params = Todo._build_list_query(status, category_id, priority, limit, offset,
+                                               search, sort_by, sort_order, with_total=True)
+        rows = db_manager.iter_named_query(query, params)
+        # 総件数は先頭行から取得し、残りの行は読み進めるまで取り出さない
+        first_row = next(rows, None)
+        if first_row is None:
+            return iter(()), Todo.count(status, category_id, priority, search) if offset else 0
+        categories = {}
+        todos = (Todo._from_joined_row(row, categories) for row in chain((first_row,), rows))
+        return todos, first_row.total_count
+    
+    @staticmethod
+    def iter_all(status: str = None, category_id: int = None, priority: str = None,
+                 limit: int = None, offset: int = 0) -> Iterator['Todo']:
+        """Todo一覧をカーソルから1件ずつ取得（全件をメモリに載せない）"""
+        query, params = Todo._build_list_query(status, category_id, priority, limit, offset)
+        categories = {}
+        for row in db_manager.iter_named_query(query, params):
+            yield Todo._from_joined_row(row, categories)
+    
+    @staticmethod
+    def count(status: str = None, category_id: int = None, priority: str = None,
+              search: str = None) -> int:
+        """条件に一致するTodo件数を取得"""
+        query = _build_count(bool(status), bool(category_id), bool(priority), _search_mode(search))
+        rows = db_manager.execute_query(query, Todo._filter_params(status, category_id, priority, search))
+        return rows[0][0] if rows else 0
+    
+    @staticmethod
+    def get_recent(limit: int = 10) -> List['Todo']:
+        """一覧の先頭から指定件数のTodoを取得"""
+        return Todo.get_all(limit=limit)
+    
+    @staticmethod
+    def get_overdue(today: date = None) -> List['Todo']:
+        """期限切れの未完了Todoを取得"""
+        today = today or date.today()
+        return Todo._fetch_list(_build_due_select('<'), (today.isoformat(),))
+    
+    @staticmethod
+    def get_due_today(today: date = None) -> List['Todo']:
+        """今日が期限の未完了Todoを取得"""
+        today = today or date.today()
+        return Todo._fetch_list(_build_due_select('='), (today.isoformat(),))
+    
+    @staticmethod
+    def get_dashboard(recent_limit: int = 10,
+                      today: date = None) -> Tuple[List['Todo'], List['Todo'], List['Todo']]:
+        """最近・期限切れ・今日期限のTodo一覧を1回のクエリで取得"""
+        today = (today or date.today()).isoformat()
+        lists = ([], [], [])
+        categories = {}
+        for row in db_manager.execute_named_query(_SELECT_DASHBOARD_TODOS, (recent_limit, today, today)):
+            lists[row.section].append(Todo._from_joined_row(row, categories))
+        return lists
+    
+    @staticmethod
+    def fingerprint(status: str = None, category_id: int = None, priority: str = None) -> tuple:
+        """条件に一致するTodoの変更検知用の値（全Todoの変更回数, 件数）"""
+        query = _build_fingerprint(bool(status), bool(category_id), bool(priority))
+        row = db_manager.execute_query(query, Todo._filter_params(status, category_id, priority))[0]
+        return tuple(row)
     
     @staticmethod
     def get_by_id(todo_id: int) -> Optional['Todo']:
         """IDでTodoを取得"""
-        query = '''
-            SELECT t.*, c.name as category_name, c.color as category_color
+        rows = db_manager.execute_named_query(_SELECT_TODO_BY_ID, (todo_id,))
+        return Todo._from_joined_row(rows[0]) if rows else None
+    
+    @staticmethod
+    def get_by_ids(todo_ids) -> List['Todo']:
+        """複数IDのTodoを1回のクエリで取得（指定順、存在しないIDは除外）"""
+        todo_ids = list(todo_ids)
+        if not todo_ids:
+            return []
+        query = f'''
+            SELECT {TODO_WITH_CATEGORY_COLUMNS}
             FROM todos t
             LEFT JOIN categories c ON t.category_id = c.id
-            WHERE t.id = ?
+            WHERE t.{_id_condition(len(todo_ids))}
         '''
-        rows = db_manager.execute_query(query, (todo_id,))
-        if rows:
-            row = rows[0]
-            todo = Todo.from_dict(dict(row))
-            if row['category_name']:
-                todo._category = Category(
-                    id=row['category_id'],
-                    name=row['category_name'],
-                    color=row['category_color']
-                )
-            return todo
-        return None
+        categories = {}
+        todos = {row.id: Todo._from_joined_row(row, categories)
+                 for row in db_manager.execute_named_query(query, tuple(todo_ids))}
+        return [todos[todo_id] for todo_id in todo_ids if todo_id in todos]
+    
+    @staticmethod
+    def bulk_update(todo_ids: List[int], updates: Dict[str, Any]):
+        """複数のTodoの指定項目を1つのUPDATE文（1トランザクション）で更新"""
+        fields = tuple(field for field in TODO_UPDATE_COLUMNS if field in updates)
+        if not todo_ids or not fields:
+            return
+        params = tuple(updates[field] for field in fields) + tuple(todo_ids)
+        db_manager.execute_update(_build_update(fields, len(todo_ids)), params)
+        cache.invalidate('stats')
+    
+    @staticmethod
+    def bulk_delete(todo_ids: List[int]):
+        """複数のTodoを1つのDELETE文で削除"""
+        if not todo_ids:
+            return
+        db_manager.execute_update(f'DELETE FROM todos WHERE {_id_condition(len(todo_ids))}', tuple(todo_ids))
+        cache.invalidate('stats')
+    
+    @staticmethod
+    def get_stats_by_category() -> List[tuple]:
+        """カテゴリ・ステータスごとのTodo件数を1回の集計クエリで取得（category_id, status, 件数）"""
+        query = '''
+            SELECT category_id, status, COUNT(*)
+            FROM todos
+            WHERE category_id IS NOT NULL
+            GROUP BY category_id, status
+        '''
+        return db_manager.execute_query(query)
     
     @staticmethod
+    @memoize('stats', ttl=STATS_CACHE_TTL)
     def get_statistics() -> Dict[str, Any]:
         """統計情報を取得"""
-        query = '''
-            SELECT 
-                COUNT(*) as total_tasks,
-                COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_tasks,
-                COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_tasks,
-                COUNT(CASE WHEN status = 'in_progress' THEN 1 END) as in_progress_tasks,
-                COUNT(CASE WHEN due_date IS NOT NULL AND due_date < DATE('now') AND status != 'completed' THEN 1 END) as overdue_tasks,
-                COUNT(CASE WHEN priority = 'high' AND status != 'completed' THEN 1 END) as high_priority_tasks
+        # ステータス・優先度ごとの件数はトリガーで維持している集計テーブルから取得
+        group_query = '''
+            SELECT status, priority, count
+            FROM todo_counts
+            WHERE count > 0
+        '''
+        # 期限切れ件数は (due_date, status) インデックスの範囲検索で取得
+        overdue_query = '''
+            SELECT COUNT(*)
             FROM todos
+            WHERE due_date < DATE('now') AND status != 'completed'
         '''
-        rows = db_manager.execute_query(query)
-        if rows:
-            stats = dict(rows[0])
-            stats['completion_rate'] = (
-                (stats['completed_tasks'] / stats['total_tasks'] * 100) 
-                if stats['total_tasks'] > 0 else 0
-            )
-            return stats
-        return {}
\ No newline at end of file
+        
+        stats = {
+            'total_tasks': 0,
+            'completed_tasks': 0,
+            'pending_tasks': 0,
+            'in_progress_tasks': 0,
+            'overdue_tasks': 0,
+            'high_priority_tasks': 0
+        }
+        for row in db_manager.execute_query(group_query):
+            status, count = row['status'], row['count']
+            stats['total_tasks'] += count
+            if status in STATUS_STAT_KEYS:
+                stats[STATUS_STAT_KEYS[status]] += count
+            if row['priority'] == 'high' and status and status != 'completed':
+                stats['high_priority_tasks'] += count
+        
+        stats['overdue_tasks'] = db_manager.execute_query(overdue_query)[0][0]
+        stats['completion_rate'] = (
+            (stats['completed_tasks'] / stats['total_tasks'] * 100) 
+            if stats['total_tasks'] > 0 else 0
+        )
+        return stats
\ No newline at end of file
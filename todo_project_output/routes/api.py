@@ -5,7 +5,11 @@ REST API エンドポイントを管理
 
 from flask import Blueprint, request, jsonify, current_app
 from models import Todo, Category
-from datetime import datetime
+from sqlite3 import IntegrityError
+from models.todo import UPDATABLE_FIELDS, PRIORITIES, STATUSES, parse_iso_date
+from json_provider import list_response
+from datetime import date
+from typing import List, Optional
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -19,32 +23,28 @@ def get_todos():
         category_id = request.args.get('category_id', type=int)
         priority = request.args.get('priority')
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        per_page = request.args.get('per_page', current_app.config.get('TODOS_PER_PAGE', 20), type=int)
         
         # バリデーション
-        if per_page > 100:
-            per_page = 100
-        
-        todos = Todo.get_all(status=status, category_id=category_id, priority=priority)
-        
-        # ページネーション（簡易実装）
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_todos = todos[start:end]
-        
-        return jsonify({
-            'success': True,
-            'data': [todo.to_dict(include_category=True) for todo in paginated_todos],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': len(todos),
-                'pages': (len(todos) + per_page - 1) // per_page
-            }
-        })
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), 100)
+        
+        # ページネーション（SQL の LIMIT/OFFSET で該当ページと総件数を1回で取得）
+        todos, total = Todo.get_page(status=status, category_id=category_id, priority=priority,
+                                     limit=per_page, offset=(page - 1) * per_page)
+        category_map = Todo.build_category_map(todos)
+        today = date.today()
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': (total + per_page - 1) // per_page
+        }
+        
+        return list_response((todo.to_dict_with_category(category_map, today) for todo in todos), pagination)
         
     except Exception as e:
-        current_app.logger.error(f"Error in get_todos API: {str(e)}")
+        current_app.logger.error("Error in get_todos API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -62,9 +62,8 @@ def create_todo():
         # 日付変換
         due_date = None
         if data.get('due_date'):
-            try:
-                due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
-            except ValueError:
+            due_date = parse_iso_date(data['due_date'])
+            if due_date is None:
                 return jsonify({'success': False, 'error': '日付形式が正しくありません（YYYY-MM-DD）'}), 400
         
         # Todo作成
@@ -78,8 +77,8 @@ def create_todo():
             display_order=data.get('display_order', 0)
         )
         
-        todo_id = todo.save()
-        todo = Todo.get_by_id(todo_id)
+        todo.save()
+        todo.load_category()
         
         return jsonify({
             'success': True,
@@ -87,8 +86,11 @@ def create_todo():
             'message': 'Todoが作成されました'
         }), 201
         
+    except IntegrityError:
+        # 存在しないカテゴリは外部キー制約で検出
+        return jsonify({'success': False, 'errors': ['指定されたカテゴリが存在しません']}), 400
     except Exception as e:
-        current_app.logger.error(f"Error in create_todo API: {str(e)}")
+        current_app.logger.error("Error in create_todo API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -106,7 +108,7 @@ def get_todo(todo_id: int):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error in get_todo API: {str(e)}")
+        current_app.logger.error("Error in get_todo API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -125,29 +127,18 @@ def update_todo(todo_id: int):
         if errors:
             return jsonify({'success': False, 'errors': errors}), 400
         
-        # データ更新
-        if 'title' in data:
-            todo.title = data['title']
-        if 'description' in data:
-            todo.description = data['description']
-        if 'category_id' in data:
-            todo.category_id = data['category_id']
-        if 'priority' in data:
-            todo.priority = data['priority']
-        if 'status' in data:
-            todo.status = data['status']
-        if 'due_date' in data:
-            if data['due_date']:
-                try:
-                    todo.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
-                except ValueError:
+        # 送信された項目のみ更新
+        updates = {key: data[key] for key in UPDATABLE_FIELDS if key in data}
+        if 'due_date' in updates:
+            if updates['due_date']:
+                updates['due_date'] = parse_iso_date(updates['due_date'])
+                if updates['due_date'] is None:
                     return jsonify({'success': False, 'error': '日付形式が正しくありません（YYYY-MM-DD）'}), 400
             else:
-                todo.due_date = None
-        if 'display_order' in data:
-            todo.display_order = data['display_order']
+                updates['due_date'] = None
         
-        todo.save()
+        todo.update_fields(updates)
+        todo.load_category()
         
         return jsonify({
             'success': True,
@@ -155,8 +146,11 @@ def update_todo(todo_id: int):
             'message': 'Todoが更新されました'
         })
         
+    except IntegrityError:
+        # 存在しないカテゴリは外部キー制約で検出
+        return jsonify({'success': False, 'errors': ['指定されたカテゴリが存在しません']}), 400
     except Exception as e:
-        current_app.logger.error(f"Error in update_todo API: {str(e)}")
+        current_app.logger.error("Error in update_todo API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -164,19 +158,16 @@ def update_todo(todo_id: int):
 def delete_todo(todo_id: int):
     """Todo削除API"""
     try:
-        todo = Todo.get_by_id(todo_id)
-        if not todo:
+        if not Todo.delete_by_id(todo_id):
             return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
         
-        todo.delete()
-        
         return jsonify({
             'success': True,
             'message': 'Todoが削除されました'
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error in delete_todo API: {str(e)}")
+        current_app.logger.error("Error in delete_todo API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -184,16 +175,13 @@ def delete_todo(todo_id: int):
 def toggle_todo(todo_id: int):
     """Todo完了状態切り替えAPI"""
     try:
-        todo = Todo.get_by_id(todo_id)
-        if not todo:
+        # 存在確認と切り替えを1つのUPDATE文で行う
+        status = Todo.toggle(todo_id)
+        if status is None:
             return jsonify({'success': False, 'error': 'Todoが見つかりません'}), 404
         
-        if todo.status == 'completed':
-            todo.mark_pending()
-            message = 'Todoを未完了にしました'
-        else:
-            todo.mark_completed()
-            message = 'Todoを完了にしました'
+        todo = Todo.get_by_id(todo_id)
+        message = 'Todoを完了にしました' if status == 'completed' else 'Todoを未完了にしました'
         
         return jsonify({
             'success': True,
@@ -202,7 +190,7 @@ def toggle_todo(todo_id: int):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error in toggle_todo API: {str(e)}")
+        current_app.logger.error("Error in toggle_todo API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -217,7 +205,7 @@ def get_categories():
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error in get_categories API: {str(e)}")
+        current_app.logger.error("Error in get_categories API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -241,8 +229,7 @@ def create_category():
             description=data.get('description', '')
         )
         
-        category_id = category.save()
-        category = Category.get_by_id(category_id)
+        category.save()
         
         return jsonify({
             'success': True,
@@ -251,7 +238,7 @@ def create_category():
         }), 201
         
     except Exception as e:
-        current_app.logger.error(f"Error in create_category API: {str(e)}")
+        current_app.logger.error("Error in create_category API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -266,7 +253,7 @@ def get_statistics():
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error in get_statistics API: {str(e)}")
+        current_app.logger.error("Error in get_statistics API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -285,31 +272,37 @@ def bulk_update_todos():
         if not isinstance(todo_ids, list) or not todo_ids:
             return jsonify({'success': False, 'error': 'todo_idsは空でないリストである必要があります'}), 400
         
-        updated_todos = []
-        
-        for todo_id in todo_ids:
-            todo = Todo.get_by_id(todo_id)
-            if not todo:
-                continue
-            
-            if action == 'complete':
-                todo.mark_completed()
-            elif action == 'pending':
-                todo.mark_pending()
-            elif action == 'delete':
-                todo.delete()
-                continue
-            elif action == 'update_priority':
-                priority = data.get('priority')
-                if priority in ['low', 'medium', 'high']:
-                    todo.priority = priority
-                    todo.save()
-            elif action == 'update_category':
-                category_id = data.get('category_id')
-                todo.category_id = category_id
-                todo.save()
-            
-            updated_todos.append(todo.to_dict(include_category=True))
+        # 文字列のIDも受け付け、比較・検索は整数で行う
+        todo_ids = parse_ids(todo_ids)
+        if todo_ids is None:
+            return jsonify({'success': False, 'error': 'todo_idsには整数のIDを指定してください'}), 400
+        
+        # 対象を1回のクエリで取得し、操作は1つのSQL文でまとめて適用
+        todos = Todo.get_by_ids(todo_ids)
+        existing_ids = list(dict.fromkeys(todo.id for todo in todos))
+        
+        updates = {}
+        if action == 'complete':
+            updates['status'] = 'completed'
+        elif action == 'pending':
+            updates['status'] = 'pending'
+        elif action == 'delete':
+            Todo.bulk_delete(existing_ids)
+            todos = []
+        elif action == 'update_priority':
+            priority = data.get('priority')
+            if is_choice(priority, PRIORITIES):
+                updates['priority'] = priority
+        elif action == 'update_category':
+            updates['category_id'] = data.get('category_id')
+        
+        if updates:
+            Todo.bulk_update(existing_ids, updates)
+            # 完了日時などトリガーで設定される値も含め、保存された内容を返す
+            todos = Todo.get_by_ids(existing_ids)
+        
+        today = date.today()
+        updated_todos = [todo.to_dict(include_category=True, today=today) for todo in todos]
         
         return jsonify({
             'success': True,
@@ -317,11 +310,44 @@ def bulk_update_todos():
             'message': f'{len(updated_todos)}件のTodoを更新しました'
         })
         
+    except IntegrityError:
+        # 存在しないカテゴリへの変更は外部キー制約で検出
+        return jsonify({'success': False, 'errors': ['指定されたカテゴリが存在しません']}), 400
     except Exception as e:
-        current_app.logger.error(f"Error in bulk_update_todos API: {str(e)}")
+        current_app.logger.error("Error in bulk_update_todos API: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# JSONで受け付ける項目の型（None は未指定として扱う。due_date は日付として別途検証）
+TODO_FIELD_TYPES = (
+    ('title', str),
+    ('description', str),
+    ('category_id', int),
+    ('priority', str),
+    ('status', str),
+    ('display_order', int),
+)
+
+
+def parse_ids(values: list) -> Optional[List[int]]:
+    """IDのリストを整数に変換（整数・整数の文字列以外を含む場合は None）"""
+    ids = []
+    for value in values:
+        # bool は int のサブクラスのため除外
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            return None
+        try:
+            ids.append(int(value))
+        except ValueError:
+            return None
+    return ids
+
+
+def is_choice(value, choices: frozenset) -> bool:
+    """値が選択肢のいずれかか（JSONのリスト・オブジェクトなどハッシュできない値は不正として扱う）"""
+    return isinstance(value, str) and value in choices
+
+
 def validate_todo_data(data: dict, is_update: bool = False) -> list:
     """Todoデータバリデーション"""
     errors = []
@@ -330,6 +356,14 @@ def validate_todo_data(data: dict, is_update: bool = False) -> list:
         errors.append('データが必要です')
         return errors
     
+    # 型バリデーション（bool は int のサブクラスのため除外）
+    for field, expected_type in TODO_FIELD_TYPES:
+        value = data.get(field)
+        if value is not None and (not isinstance(value, expected_type) or isinstance(value, bool)):
+            errors.append(f'{field} の形式が正しくありません')
+    if errors:
+        return errors
+    
     # タイトルバリデーション（新規作成時は必須）
     if not is_update and not data.get('title'):
         errors.append('タイトルは必須です')
@@ -337,17 +371,11 @@ def validate_todo_data(data: dict, is_update: bool = False) -> list:
         errors.append('タイトルは200文字以内で入力してください')
     
     # 優先度バリデーション
-    if data.get('priority') and data['priority'] not in ['low', 'medium', 'high']:
+    if data.get('priority') and not is_choice(data['priority'], PRIORITIES):
         errors.append('優先度は low, medium, high のいずれかを指定してください')
     
     # ステータスバリデーション
-    if data.get('status') and data['status'] not in ['pending', 'in_progress', 'completed']:
+    if data.get('status') and not is_choice(data['status'], STATUSES):
         errors.append('ステータスは pending, in_progress, completed のいずれかを指定してください')
     
-    # カテゴリバリデーション
-    if data.get('category_id'):
-        category = Category.get_by_id(data['category_id'])
-        if not category:
-            errors.append('指定されたカテゴリが存在しません')
-    
     return errors
\ No newline at end of file
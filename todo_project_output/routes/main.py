@@ -3,30 +3,59 @@
 Webページのルーティングを管理
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
 from models import Todo, Category
-from datetime import datetime
+from http_cache import etag_page
+from streaming import stream_page
+from sqlite3 import IntegrityError
+from models.todo import PRIORITIES, STATUSES, parse_iso_date
+from datetime import date
 
 main_bp = Blueprint('main', __name__)
 
 
+def wants_json() -> bool:
+    """JavaScriptからの要求か（ページを再描画せずJSONで結果を返す）"""
+    return (request.accept_mimetypes.best == 'application/json'
+            or request.headers.get('X-Requested-With') == 'XMLHttpRequest')
+
+
+def redirect_on_error(message: str):
+    """ページ操作の例外をログに記録し、エラーを表示してTodo一覧に戻すデコレーター"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except IntegrityError:
+                # 存在しないカテゴリは外部キー制約で検出
+                error = '指定されたカテゴリが存在しません'
+                status_code = 400
+            except Exception:
+                current_app.logger.exception("Error in %s", func.__name__)
+                error = message
+                status_code = 500
+            if wants_json():
+                return jsonify(error=error), status_code
+            flash(error, 'error')
+            return redirect(url_for('main.todos'))
+        return wrapper
+    return decorator
+
+
 @main_bp.route('/')
+@etag_page(lambda: (Todo.fingerprint(), Category.fingerprint(), date.today()), cache_page=True)
 def index():
     """メインページ"""
     try:
-        # 最新のTodoを取得
-        todos = Todo.get_all()
         categories = Category.get_all()
         stats = Todo.get_statistics()
         
-        # 最近のTodo（上位10件）
-        recent_todos = todos[:10]
-        
-        # 期限切れのTodo
-        overdue_todos = [todo for todo in todos if todo.is_overdue]
-        
-        # 今日期限のTodo
-        due_today_todos = [todo for todo in todos if todo.is_due_today]
+        # 最近のTodo（上位10件）・期限切れ・今日期限のTodoを1回のクエリで取得
+        recent_todos, overdue_todos, due_today_todos = Todo.get_dashboard(10, date.today())
         
         return render_template('index.html',
                              recent_todos=recent_todos,
@@ -36,7 +65,7 @@ def index():
                              stats=stats)
                              
     except Exception as e:
-        current_app.logger.error(f"Error in index route: {str(e)}")
+        current_app.logger.error("Error in index route: %s", e)
         flash('データの取得中にエラーが発生しました', 'error')
         return render_template('index.html',
                              recent_todos=[],
@@ -47,6 +76,7 @@ def index():
 
 
 @main_bp.route('/todos')
+@etag_page(lambda: (Todo.fingerprint(), Category.fingerprint(), date.today()), cache_page=True)
 def todos():
     """Todo一覧ページ"""
     try:
@@ -60,35 +90,38 @@ def todos():
         sort_by = request.args.get('sort', 'created_at')  # created_at, due_date, priority, title
         sort_order = request.args.get('order', 'desc')  # asc, desc
         
-        # Todo取得
-        todos = Todo.get_all(status=status, category_id=category_id, priority=priority)
+        # ページネーションパラメータ
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', current_app.config.get('TODOS_PER_PAGE', 20), type=int), 1), 100)
         
-        # 検索フィルタ
-        if search_query:
-            todos = [
-                todo for todo in todos
-                if search_query.lower() in todo.title.lower() or
-                (todo.description and search_query.lower() in todo.description.lower())
-            ]
-        
-        # ソート処理
-        todos = sort_todos(todos, sort_by, sort_order)
+        # 検索・並び替え・ページングはSQL側で実行し、結果はカーソルから読みながら描画
+        todos, total = Todo.iter_page(status=status, category_id=category_id, priority=priority,
+                                      limit=per_page, offset=(page - 1) * per_page,
+                                      search=search_query, sort_by=sort_by, sort_order=sort_order)
         
         # カテゴリ一覧
         categories = Category.get_all()
         
-        return render_template('todo_list.html',
-                             todos=todos,
-                             categories=categories,
-                             current_status=status,
-                             current_category=category_id,
-                             current_priority=priority,
-                             search_query=search_query,
-                             sort_by=sort_by,
-                             sort_order=sort_order)
-                             
+        context = dict(todos=todos,
+                       categories=categories,
+                       current_status=status,
+                       current_category=category_id,
+                       current_priority=priority,
+                       search_query=search_query,
+                       sort_by=sort_by,
+                       sort_order=sort_order,
+                       page=page,
+                       per_page=per_page,
+                       total=total)
+        
+        # 検索・絞り込み・ページ指定時は描画したHTMLを順次送信する
+        # 既定の表示は一括で描画し、etag_page が描画結果を保持する
+        if request.args:
+            return stream_page('todo_list.html', 'Todo一覧の表示中にエラーが発生しました', **context)
+        return render_template('todo_list.html', **context)
+        
     except Exception as e:
-        current_app.logger.error(f"Error in todos route: {str(e)}")
+        current_app.logger.error("Error in todos route: %s", e)
         flash('Todo一覧の取得中にエラーが発生しました', 'error')
         return render_template('todo_list.html',
                              todos=[],
@@ -99,6 +132,7 @@ def todos():
 
 
 @main_bp.route('/todos/create', methods=['GET', 'POST'])
+@redirect_on_error('Todoの作成中にエラーが発生しました')
 def create_todo():
     """Todo作成ページ"""
     if request.method == 'GET':
@@ -109,231 +143,185 @@ def create_todo():
                                  todo=None,
                                  action='create')
         except Exception as e:
-            current_app.logger.error(f"Error in create_todo GET: {str(e)}")
+            current_app.logger.error("Error in create_todo GET: %s", e)
             flash('ページの読み込み中にエラーが発生しました', 'error')
             return redirect(url_for('main.todos'))
     
-    # POST処理
-    try:
-        # フォームデータ取得
-        title = request.form.get('title', '').strip()
-        description = request.form.get('description', '').strip()
-        category_id = request.form.get('category_id', type=int)
-        priority = request.form.get('priority', 'medium')
-        due_date_str = request.form.get('due_date', '').strip()
-        
-        # バリデーション
-        errors = []
-        if not title:
-            errors.append('タイトルは必須です')
-        if len(title) > 200:
-            errors.append('タイトルは200文字以内で入力してください')
-        if priority not in ['low', 'medium', 'high']:
-            errors.append('無効な優先度が指定されました')
-        
-        # 日付変換
-        due_date = None
-        if due_date_str:
-            try:
-                due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                errors.append('日付形式が正しくありません')
-        
-        # カテゴリ存在チェック
-        if category_id:
-            category = Category.get_by_id(category_id)
-            if not category:
-                errors.append('指定されたカテゴリが存在しません')
-        
-        if errors:
-            for error in errors:
-                flash(error, 'error')
-            categories = Category.get_all()
-            return render_template('todo_form.html',
-                                 categories=categories,
-                                 todo=None,
-                                 action='create',
-                                 form_data=request.form)
-        
-        # Todo作成
-        todo = Todo(
-            title=title,
-            description=description,
-            category_id=category_id,
-            priority=priority,
-            due_date=due_date
-        )
-        
-        todo.save()
-        flash('Todoが作成されました', 'success')
-        return redirect(url_for('main.todos'))
-        
-    except Exception as e:
-        current_app.logger.error(f"Error in create_todo POST: {str(e)}")
-        flash('Todoの作成中にエラーが発生しました', 'error')
-        return redirect(url_for('main.todos'))
+    # POST処理（フォームデータ取得・バリデーション）
+    form = TodoForm.from_request(request.form)
+    
+    if form.errors:
+        for error in form.errors:
+            flash(error, 'error')
+        categories = Category.get_all()
+        return render_template('todo_form.html',
+                             categories=categories,
+                             todo=None,
+                             action='create',
+                             form_data=request.form)
+    
+    # Todo作成
+    todo = Todo(**form.fields)
+    
+    todo.save()
+    flash('Todoが作成されました', 'success')
+    return redirect(url_for('main.todos'))
 
 
 @main_bp.route('/todos/<int:todo_id>/edit', methods=['GET', 'POST'])
+@redirect_on_error('Todoの編集中にエラーが発生しました')
 def edit_todo(todo_id: int):
     """Todo編集ページ"""
-    try:
-        todo = Todo.get_by_id(todo_id)
-        if not todo:
-            flash('Todoが見つかりません', 'error')
-            return redirect(url_for('main.todos'))
-        
-        if request.method == 'GET':
-            categories = Category.get_all()
-            return render_template('todo_form.html',
-                                 categories=categories,
-                                 todo=todo,
-                                 action='edit')
-        
-        # POST処理
-        title = request.form.get('title', '').strip()
-        description = request.form.get('description', '').strip()
-        category_id = request.form.get('category_id', type=int)
-        priority = request.form.get('priority', 'medium')
-        status = request.form.get('status', 'pending')
-        due_date_str = request.form.get('due_date', '').strip()
-        
-        # バリデーション
-        errors = []
-        if not title:
-            errors.append('タイトルは必須です')
-        if len(title) > 200:
-            errors.append('タイトルは200文字以内で入力してください')
-        if priority not in ['low', 'medium', 'high']:
-            errors.append('無効な優先度が指定されました')
-        if status not in ['pending', 'in_progress', 'completed']:
-            errors.append('無効なステータスが指定されました')
-        
-        # 日付変換
-        due_date = None
-        if due_date_str:
-            try:
-                due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                errors.append('日付形式が正しくありません')
-        
-        # カテゴリ存在チェック
-        if category_id:
-            category = Category.get_by_id(category_id)
-            if not category:
-                errors.append('指定されたカテゴリが存在しません')
-        
-        if errors:
-            for error in errors:
-                flash(error, 'error')
-            categories = Category.get_all()
-            return render_template('todo_form.html',
-                                 categories=categories,
-                                 todo=todo,
-                                 action='edit',
-                                 form_data=request.form)
-        
-        # Todo更新
-        todo.title = title
-        todo.description = description
-        todo.category_id = category_id
-        todo.priority = priority
-        todo.status = status
-        todo.due_date = due_date
-        
-        todo.save()
-        flash('Todoが更新されました', 'success')
-        return redirect(url_for('main.todos'))
-        
-    except Exception as e:
-        current_app.logger.error(f"Error in edit_todo: {str(e)}")
-        flash('Todoの編集中にエラーが発生しました', 'error')
+    todo = Todo.get_by_id(todo_id)
+    if not todo:
+        flash('Todoが見つかりません', 'error')
         return redirect(url_for('main.todos'))
+    
+    if request.method == 'GET':
+        categories = Category.get_all()
+        return render_template('todo_form.html',
+                             categories=categories,
+                             todo=todo,
+                             action='edit')
+    
+    # POST処理（フォームデータ取得・バリデーション）
+    form = TodoForm.from_request(request.form, require_status=True)
+    
+    if form.errors:
+        for error in form.errors:
+            flash(error, 'error')
+        categories = Category.get_all()
+        return render_template('todo_form.html',
+                             categories=categories,
+                             todo=todo,
+                             action='edit',
+                             form_data=request.form)
+    
+    # Todo更新
+    for field, value in form.fields.items():
+        setattr(todo, field, value)
+    
+    todo.save()
+    flash('Todoが更新されました', 'success')
+    return redirect(url_for('main.todos'))
 
 
 @main_bp.route('/todos/<int:todo_id>/delete', methods=['POST'])
+@redirect_on_error('Todoの削除中にエラーが発生しました')
 def delete_todo(todo_id: int):
     """Todo削除"""
-    try:
-        todo = Todo.get_by_id(todo_id)
-        if not todo:
-            flash('Todoが見つかりません', 'error')
-            return redirect(url_for('main.todos'))
-        
-        todo.delete()
-        flash('Todoが削除されました', 'success')
-        
-    except Exception as e:
-        current_app.logger.error(f"Error in delete_todo: {str(e)}")
-        flash('Todoの削除中にエラーが発生しました', 'error')
+    deleted = Todo.delete_by_id(todo_id)
+    if wants_json():
+        if not deleted:
+            return jsonify(error='Todoが見つかりません'), 404
+        return jsonify(id=todo_id, deleted=True)
     
+    if deleted:
+        flash('Todoが削除されました', 'success')
+    else:
+        flash('Todoが見つかりません', 'error')
     return redirect(url_for('main.todos'))
 
 
 @main_bp.route('/todos/<int:todo_id>/toggle', methods=['POST'])
+@redirect_on_error('Todo状態の変更中にエラーが発生しました')
 def toggle_todo(todo_id: int):
     """Todo完了状態切り替え"""
-    try:
-        todo = Todo.get_by_id(todo_id)
-        if not todo:
-            flash('Todoが見つかりません', 'error')
-            return redirect(url_for('main.todos'))
-        
-        if todo.status == 'completed':
-            todo.mark_pending()
-            flash('Todoを未完了にしました', 'info')
-        else:
-            todo.mark_completed()
-            flash('Todoを完了にしました', 'success')
-        
-    except Exception as e:
-        current_app.logger.error(f"Error in toggle_todo: {str(e)}")
-        flash('Todo状態の変更中にエラーが発生しました', 'error')
+    # 存在確認と切り替えを1つのUPDATE文で行う
+    status = Todo.toggle(todo_id)
+    if wants_json():
+        if status is None:
+            return jsonify(error='Todoが見つかりません'), 404
+        return jsonify(id=todo_id, status=status)
     
+    if status is None:
+        flash('Todoが見つかりません', 'error')
+    elif status == 'completed':
+        flash('Todoを完了にしました', 'success')
+    else:
+        flash('Todoを未完了にしました', 'info')
     return redirect(url_for('main.todos'))
 
 
 @main_bp.route('/categories')
+@etag_page(lambda: (Todo.fingerprint(), Category.fingerprint()))
 def categories():
     """カテゴリ一覧ページ"""
     try:
         categories = Category.get_all()
         
-        # 各カテゴリのTodo数を取得
-        category_stats = {}
-        for category in categories:
-            todos = Todo.get_all(category_id=category.id)
-            category_stats[category.id] = {
-                'total': len(todos),
-                'completed': len([t for t in todos if t.status == 'completed']),
-                'pending': len([t for t in todos if t.status != 'completed'])
-            }
+        # 各カテゴリのTodo数を集計クエリ1回で取得
+        category_stats = {category.id: {'total': 0, 'completed': 0, 'pending': 0} for category in categories}
+        for category_id, status, count in Todo.get_stats_by_category():
+            stats = category_stats.get(category_id)
+            if stats is None:
+                continue
+            stats['total'] += count
+            stats['completed' if status == 'completed' else 'pending'] += count
             
         return render_template('categories.html',
                              categories=categories,
                              category_stats=category_stats)
                              
     except Exception as e:
-        current_app.logger.error(f"Error in categories route: {str(e)}")
+        current_app.logger.error("Error in categories route: %s", e)
         flash('カテゴリ一覧の取得中にエラーが発生しました', 'error')
         return render_template('categories.html',
                              categories=[],
                              category_stats={})
 
 
-def sort_todos(todos: list, sort_by: str, sort_order: str) -> list:
-    """Todo一覧のソート処理"""
-    reverse = sort_order == 'desc'
+@dataclass(frozen=True)
+class TodoForm:
+    """Todo作成・編集フォームの入力値と検証結果"""
+    title: str
+    description: str
+    category_id: Optional[int]
+    priority: str
+    status: Optional[str]
+    due_date: Optional[date]
+    errors: Tuple[str, ...]
+    
+    @classmethod
+    def from_request(cls, form, require_status: bool = False) -> 'TodoForm':
+        """フォームの値を1回ずつ取得して検証（status は編集時のみ受け付ける）"""
+        get = form.get
+        title = get('title', '').strip()
+        description = get('description', '').strip()
+        category_id = get('category_id', type=int)
+        priority = get('priority', 'medium')
+        status = get('status', 'pending') if require_status else None
+        due_date_str = get('due_date', '').strip()
+        
+        errors = []
+        if not title:
+            errors.append('タイトルは必須です')
+        if len(title) > 200:
+            errors.append('タイトルは200文字以内で入力してください')
+        if priority not in PRIORITIES:
+            errors.append('無効な優先度が指定されました')
+        if require_status and status not in STATUSES:
+            errors.append('無効なステータスが指定されました')
+        
+        # 日付変換
+        due_date = None
+        if due_date_str:
+            due_date = parse_iso_date(due_date_str)
+            if due_date is None:
+                errors.append('日付形式が正しくありません')
+        
+        return cls(title, description, category_id, priority, status, due_date, tuple(errors))
     
-    if sort_by == 'title':
-        return sorted(todos, key=lambda x: x.title.lower(), reverse=reverse)
-    elif sort_by == 'priority':
-        priority_order = {'high': 3, 'medium': 2, 'low': 1}
-        return sorted(todos, key=lambda x: priority_order.get(x.priority, 0), reverse=reverse)
-    elif sort_by == 'due_date':
-        return sorted(todos, key=lambda x: x.due_date or datetime.max.date(), reverse=reverse)
-    elif sort_by == 'status':
-        status_order = {'pending': 1, 'in_progress': 2, 'completed': 3}
-        return sorted(todos, key=lambda x: status_order.get(x.status, 0), reverse=reverse)
-    else:  # created_at (default)
-        return sorted(todos, key=lambda x: x.created_at or datetime.min, reverse=reverse)
\ No newline at end of file
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Todoに設定する項目（status は受け付けた場合のみ）"""
+        fields = {
+            'title': self.title,
+            'description': self.description,
+            'category_id': self.category_id,
+            'priority': self.priority,
+            'due_date': self.due_date
+        }
+        if self.status is not None:
+            fields['status'] = self.status
+        return fields
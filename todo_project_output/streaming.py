@@ -0,0 +1,27 @@
+"""
+ストリーミング描画モジュール
+テンプレートを描画しながらHTMLを順次送信する
+"""
+
+from typing import Iterator
+from flask import Response, current_app, stream_template
+from markupsafe import escape
+
+# 描画途中でエラーが発生した場合にページ末尾へ出力する通知
+ERROR_FRAGMENT = '<div class="alert alert-danger" role="alert">{}</div>'
+
+
+def stream_page(template_name: str, error_message: str, **context) -> Response:
+    """テンプレートを順次送信するレスポンスを生成（描画途中のエラーはログに記録し、通知を出力して終了）"""
+    # 送信開始後のエラーはルートの例外処理を通らず、ステータスも変更できないため生成器内で処理する
+    logger = current_app.logger
+    chunks = stream_template(template_name, **context)
+
+    def generate() -> Iterator[str]:
+        try:
+            yield from chunks
+        except Exception:
+            logger.exception("Error while streaming %s", template_name)
+            yield ERROR_FRAGMENT.format(escape(error_message))
+
+    return Response(generate())
@@ -0,0 +1,48 @@
+"""
+テスト共通設定
+アプリケーションをテスト用のSQLiteファイルで作成する
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+# アプリケーションのモジュール（app, database, models など）をトップレベルで import する
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# 本番設定クラスは定義時に SECRET_KEY を要求する
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
+from app import create_app  # noqa: E402
+from cache import cache  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from json_provider import init_json_provider  # noqa: E402
+from routes.api import api_bp  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """テスト用アプリケーション（:memory: は接続ごとに別のDBになるためファイルを使用）"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TestingConfig, 'DATABASE_PATH', str(tmp_path / 'test.db'))
+    cache.clear()
+    app = create_app('testing')
+    yield app
+    cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    """テストクライアント"""
+    return app.test_client()
+
+
+@pytest.fixture
+def api_client(app):
+    """APIブループリント（routes/api.py）のテストクライアント（create_app では登録されないため個別に作成）"""
+    blueprint_app = Flask('blueprint_api')
+    init_json_provider(blueprint_app)
+    blueprint_app.register_blueprint(api_bp)
+    return blueprint_app.test_client()
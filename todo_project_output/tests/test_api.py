@@ -0,0 +1,98 @@
+"""
+APIのテスト
+"""
+
+from datetime import date
+
+import pytest
+
+import app as app_module
+from database import db_manager
+
+
+@pytest.mark.parametrize('due_date', ['2020-13-45', '2024/01/01', '20240101', 20240101])
+def test_create_rejects_invalid_due_date(client, due_date):
+    """不正な期限日の作成は 400 で、Todoは保存されない"""
+    total = client.get('/api/todos').get_json()['pagination']['total']
+    response = client.post('/api/todos', json={'title': 'a', 'due_date': due_date})
+    assert response.status_code == 400
+    assert client.get('/api/todos').get_json()['pagination']['total'] == total
+
+
+def test_create_accepts_iso_due_date(client):
+    """YYYY-MM-DD の期限日は保存される"""
+    response = client.post('/api/todos', json={'title': 'a', 'due_date': '2030-01-31'})
+    assert response.status_code == 201
+    assert response.get_json()['data']['due_date'] == '2030-01-31'
+
+
+@pytest.mark.parametrize('due_date', ['2020-13-45', 'tomorrow', 5])
+def test_update_rejects_invalid_due_date(client, due_date):
+    """不正な期限日の更新は 400 で、既存の値は変わらない"""
+    todo_id = client.post('/api/todos', json={'title': 'a', 'due_date': '2030-01-31'}).get_json()['data']['id']
+    response = client.put(f'/api/todos/{todo_id}', json={'title': 'b', 'due_date': due_date})
+    assert response.status_code == 400
+    data = client.get(f'/api/todos/{todo_id}').get_json()['data']
+    assert (data['title'], data['due_date']) == ('a', '2030-01-31')
+
+
+def test_update_due_date(client):
+    """期限日の変更と解除"""
+    todo_id = client.post('/api/todos', json={'title': 'a'}).get_json()['data']['id']
+    response = client.put(f'/api/todos/{todo_id}', json={'due_date': '2030-02-01'})
+    assert response.status_code == 200
+    assert response.get_json()['data']['due_date'] == '2030-02-01'
+    response = client.put(f'/api/todos/{todo_id}', json={'due_date': ''})
+    assert response.get_json()['data']['due_date'] is None
+    assert client.get('/api/todos').status_code == 200
+
+
+def test_list_etag_changes_after_same_second_update(client):
+    """同じ秒の更新でも一覧のETagが変わり、古い 304 を返さない"""
+    todo_id = client.post('/api/todos', json={'title': 'a'}).get_json()['data']['id']
+    etag = client.get('/api/todos').headers['ETag']
+    assert client.get('/api/todos', headers={'If-None-Match': etag}).status_code == 304
+    
+    client.put(f'/api/todos/{todo_id}', json={'title': 'b'})
+    response = client.get('/api/todos', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_list_etag_changes_with_date(client, monkeypatch):
+    """日付が変わると期限判定が変わるため一覧のETagも変わる"""
+    etag = client.get('/api/todos').headers['ETag']
+    
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(date.today().toordinal() + 1)
+    
+    monkeypatch.setattr(app_module, 'date', Tomorrow)
+    assert client.get('/api/todos', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_list_with_unconvertible_row_returns_error(client):
+    """変換できない行があれば途中で切れた 200 ではなく 500 のJSONを返す"""
+    client.post('/api/todos', json={'title': 'a'})
+    db_manager.execute_update("UPDATE todos SET due_date = '2020-13-45'")
+    response = client.get('/api/todos')
+    assert response.status_code == 500
+    assert response.get_json()['success'] is False
+
+
+def test_update_ignores_display_order(client):
+    """並び順は更新APIでは変更できない"""
+    todo_id = client.post('/api/todos', json={'title': 'a'}).get_json()['data']['id']
+    response = client.put(f'/api/todos/{todo_id}', json={'title': 'b', 'display_order': 5})
+    assert response.status_code == 200
+    data = client.get(f'/api/todos/{todo_id}').get_json()['data']
+    assert (data['title'], data['display_order']) == ('b', 0)
+
+
+def test_missing_category_error_hides_constraint_details(client, caplog):
+    """外部キー制約違反は共通のメッセージで返し、制約の詳細はログにのみ記録する"""
+    response = client.post('/api/todos', json={'title': 'a', 'category_id': 9999})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == '指定されたカテゴリが存在しません'
+    assert 'FOREIGN KEY constraint failed' in caplog.text
@@ -0,0 +1,74 @@
+"""
+アプリケーション設定のテスト
+"""
+
+from flask import Flask
+from jinja2 import ChoiceLoader, DictLoader
+
+from app import cached_url_for, setup_templates
+
+
+def test_cached_url_for_is_per_app(app):
+    """URLのキャッシュはアプリごとに分かれ、他のアプリのURLを返さない"""
+    other = Flask('other')
+    other.config['JINJA_CACHE_DIR'] = None
+    other.add_url_rule('/other-todos', 'todos', lambda: '')
+    setup_templates(other)
+    
+    with app.test_request_context('/'):
+        assert cached_url_for('todos') == '/todos'
+    with other.test_request_context('/'):
+        assert cached_url_for('todos') == '/other-todos'
+    with app.test_request_context('/'):
+        assert cached_url_for('todos', page=2) == '/todos?page=2'
+
+
+def test_cached_todo_page_is_rendered_in_route(app, client):
+    """描画結果を保持する既定の一覧ページは一括で描画し、描画中のエラーもルート内で処理する"""
+    app.jinja_env.loader = ChoiceLoader([
+        DictLoader({'todo_list.html': '{% for todo in todos %}{{ todo.title.missing() }}{% endfor %}'}),
+        app.jinja_env.loader,
+    ])
+    client.post('/api/todos', json={'title': 'a'})
+    response = client.get('/todos')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    
+    # 絞り込み時は保持しないため順次送信する
+    with app.test_request_context('/todos?status=pending'):
+        assert app.full_dispatch_request().is_streamed
+
+
+def test_streamed_todo_page_reports_render_error(app, client, caplog):
+    """順次送信中の描画エラーはログに記録し、ページ末尾にエラーを出力する（ETagは付けない）"""
+    app.jinja_env.loader = ChoiceLoader([
+        DictLoader({'todo_list.html': '<ul>{% for todo in todos %}{{ todo.title.missing() }}{% endfor %}</ul>'}),
+        app.jinja_env.loader,
+    ])
+    client.post('/api/todos', json={'title': 'a'})
+    response = client.get('/todos?status=pending')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+    body = response.get_data(as_text=True)
+    assert body.startswith('<ul>')
+    assert body.endswith('<div class="alert alert-danger" role="alert">Todo一覧の表示中にエラーが発生しました</div>')
+    assert 'Error while streaming todo_list.html' in caplog.text
+
+
+def test_page_cache_skips_requests_with_flashes(app, client):
+    """未表示のフラッシュメッセージがあるリクエストでは保持したページを返さず、描画結果も保持しない"""
+    app.jinja_env.loader = ChoiceLoader([
+        DictLoader({'todo_list.html': '{{ get_flashed_messages()|join }}|{{ total }}'}),
+        app.jinja_env.loader,
+    ])
+    cached = client.get('/todos')
+    assert cached.status_code == 200 and 'ETag' in cached.headers
+    
+    with client.session_transaction() as session:
+        session['_flashes'] = [('info', 'notice')]
+    response = client.get('/todos', headers={'If-None-Match': cached.headers['ETag']})
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).startswith('notice|')
+    
+    # メッセージ表示後は保持済みのページを返す
+    assert client.get('/todos').get_data() == cached.get_data()
@@ -0,0 +1,53 @@
+"""
+APIブループリント（routes/api.py）のテスト
+"""
+
+import pytest
+
+
+def _todo_ids(api_client):
+    return [todo['id'] for todo in api_client.get('/api/todos').get_json()['data']]
+
+
+def test_bulk_update_missing_category(api_client):
+    """一括更新で存在しないカテゴリを指定すると 400"""
+    response = api_client.post('/api/todos/bulk', json={
+        'todo_ids': _todo_ids(api_client), 'action': 'update_category', 'category_id': 9999
+    })
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_bulk_update_accepts_string_ids(api_client):
+    """文字列のIDも整数のIDと同じように更新され、保存された値を返す"""
+    todo_id = _todo_ids(api_client)[0]
+    response = api_client.post('/api/todos/bulk', json={'todo_ids': [str(todo_id)], 'action': 'complete'})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert [(todo['id'], todo['status']) for todo in data] == [(todo_id, 'completed')]
+    
+    stored = api_client.get(f'/api/todos/{todo_id}').get_json()['data']
+    assert data[0]['completed_at'] == stored['completed_at'] is not None
+
+
+@pytest.mark.parametrize('todo_ids', [['abc'], [1.5], [True], [None], [[1]]])
+def test_bulk_update_rejects_non_integer_ids(api_client, todo_ids):
+    """整数として解釈できないIDは 400"""
+    response = api_client.post('/api/todos/bulk', json={'todo_ids': todo_ids, 'action': 'complete'})
+    assert response.status_code == 400
+
+
+def test_list_body_matches_app_api(client, api_client):
+    """一覧APIはアプリ直下・Blueprintのどちらも同じ形式で返す"""
+    app_body = client.get('/api/todos?per_page=5').get_json()
+    blueprint_body = api_client.get('/api/todos?per_page=5').get_json()
+    assert app_body.keys() == blueprint_body.keys() == {'success', 'data', 'count', 'pagination'}
+    assert blueprint_body['count'] == len(blueprint_body['data'])
+
+
+def test_update_ignores_display_order(api_client):
+    """並び順は更新APIでは変更できない"""
+    todo_id = api_client.post('/api/todos', json={'title': 'a'}).get_json()['data']['id']
+    assert api_client.put(f'/api/todos/{todo_id}', json={'title': 'b', 'display_order': 5}).status_code == 200
+    data = api_client.get(f'/api/todos/{todo_id}').get_json()['data']
+    assert (data['title'], data['display_order']) == ('b', 0)
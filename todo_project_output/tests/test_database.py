@@ -0,0 +1,61 @@
+"""
+データベース管理のテスト
+"""
+
+from database import db_manager, get_db
+from models import Todo
+
+_COUNTS_FROM_TABLE = 'SELECT status, priority, count FROM todo_counts WHERE count > 0 ORDER BY 1, 2'
+_COUNTS_FROM_TODOS = '''
+    SELECT IFNULL(status, ''), IFNULL(priority, ''), COUNT(*)
+    FROM todos GROUP BY 1, 2 ORDER BY 1, 2
+'''
+
+
+def _assert_counts_consistent():
+    """集計テーブルの件数が todos の実件数と一致する"""
+    expected = [tuple(row) for row in db_manager.execute_query(_COUNTS_FROM_TODOS)]
+    assert [tuple(row) for row in db_manager.execute_query(_COUNTS_FROM_TABLE)] == expected
+
+
+def test_todo_counts_follow_insert_update_delete(app, client):
+    """作成・更新・切り替え・一括操作・削除の後も集計テーブルが一致する"""
+    _assert_counts_consistent()
+    
+    ids = [client.post('/api/todos', json={'title': f't{i}', 'priority': priority}).get_json()['data']['id']
+           for i, priority in enumerate(('low', 'medium', 'high', 'high'))]
+    _assert_counts_consistent()
+    
+    client.put(f'/api/todos/{ids[0]}', json={'status': 'in_progress', 'priority': 'high'})
+    client.put(f'/api/todos/{ids[1]}', json={'title': '件数に影響しない更新'})
+    client.post(f'/api/todos/{ids[2]}/toggle')
+    _assert_counts_consistent()
+    
+    Todo.bulk_update(ids[:2], {'status': 'completed'})
+    client.delete(f'/api/todos/{ids[3]}')
+    Todo.bulk_delete(ids[1:3])
+    _assert_counts_consistent()
+    
+    stats = client.get('/api/statistics').get_json()['data']
+    assert stats['total_tasks'] == db_manager.execute_query('SELECT COUNT(*) FROM todos')[0][0]
+
+
+def test_request_connection_is_shared_and_pooled(app):
+    """リクエスト中は1つの接続を共有し、終了後はプールに戻して再利用する"""
+    with app.app_context():
+        conn = get_db()
+        assert get_db() is conn
+    with app.app_context():
+        assert get_db() is conn
+
+
+def test_data_revision_changes_on_every_write(app):
+    """同じ秒の書き込みでも変更検知用の値が変わる"""
+    with app.app_context():
+        todo = Todo(title='a')
+        todo.save()
+        before = Todo.fingerprint()
+        todo.update_fields({'title': 'b'})
+        after_update = Todo.fingerprint()
+        Todo.delete_by_id(todo.id)
+        assert len({before, after_update, Todo.fingerprint()}) == 3
@@ -0,0 +1,52 @@
+"""
+モデルのテスト
+"""
+
+import models.todo
+from models import Category, Todo
+
+
+def test_delete_missing_id_after_insert_on_same_connection(app):
+    """INSERT 直後に同じ接続で存在しないIDを削除しても削除扱いにならない"""
+    with app.app_context():
+        todo = Todo(title='a')
+        todo.save()
+        assert Todo.delete_by_id(todo.id + 1) is False
+        assert Todo.delete_by_id(todo.id) is True
+        assert todo.delete() is False
+
+
+def test_toggle_missing_id_after_insert_without_returning(app, monkeypatch):
+    """RETURNING を使わない経路でも存在しないIDの切り替えは None"""
+    monkeypatch.setattr(models.todo, 'SUPPORTS_RETURNING', False)
+    with app.app_context():
+        todo = Todo(title='a')
+        todo.save()
+        assert Todo.toggle(todo.id + 1) is None
+        assert Todo.toggle(todo.id) == 'completed'
+
+
+def test_category_delete_missing_after_insert(app):
+    """削除済みのカテゴリを再度削除すると False"""
+    with app.app_context():
+        category = Category(name='テスト')
+        category.save()
+        assert category.delete() is True
+        Todo(title='a').save()
+        assert category.delete() is False
+
+
+def test_api_delete_and_toggle_missing_id(client):
+    """存在しないIDの削除・切り替えAPIは 404"""
+    assert client.post('/api/todos', json={'title': 'a'}).status_code == 201
+    assert client.delete('/api/todos/999').status_code == 404
+    assert client.post('/api/todos/999/toggle').status_code == 404
+
+
+def test_missing_category_is_rejected_by_foreign_key(api_client):
+    """存在しないカテゴリの指定は外部キー制約で検出し 400 を返す"""
+    assert api_client.post('/api/todos', json={'title': 'a', 'category_id': 9999}).status_code == 400
+    created = api_client.post('/api/todos', json={'title': 'a'}).get_json()['data']
+    response = api_client.put(f"/api/todos/{created['id']}", json={'category_id': 9999})
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == ['指定されたカテゴリが存在しません']
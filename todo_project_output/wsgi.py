@@ -0,0 +1,8 @@
+"""
+WSGI エントリーポイント
+本番環境では gunicorn から読み込む: gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+from app import create_app
+
+application = create_app()